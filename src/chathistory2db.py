@@ -230,16 +230,17 @@ def load_chathistory_to_chromadb(
                     try:
                         # 基本的なコピー処理
                         os.makedirs(backup_dir, exist_ok=True)
-                        for item in os.listdir(persist_directory):
-                            src = os.path.join(persist_directory, item)
-                            dst = os.path.join(backup_dir, item)
-                            try:
-                                if os.path.isdir(src):
-                                    shutil.copytree(src, dst)
-                                else:
-                                    shutil.copy2(src, dst)
-                            except PermissionError:
-                                print(f"[WARNING] Could not backup locked item: {item}")
+                        with os.scandir(persist_directory) as entries:
+                            for entry in entries:
+                                dst = os.path.join(backup_dir, entry.name)
+                                try:
+                                    # DirEntryのキャッシュ済み種別を使い個別のstatを省く
+                                    if entry.is_dir():
+                                        shutil.copytree(entry.path, dst)
+                                    else:
+                                        shutil.copy2(entry.path, dst)
+                                except PermissionError:
+                                    print(f"[WARNING] Could not backup locked item: {entry.name}")
                         backup_success = True
                     except Exception as backup_e:
                         print(f"[WARNING] Backup failed: {backup_e}")
@@ -276,9 +277,11 @@ def load_chathistory_to_chromadb(
         existing_texts = set()  # 既存メッセージのハッシュセット（重複防止用）
 
         # ChromaDBディレクトリの存在確認と既存データ読み込み
-        chromadb_exists = os.path.exists(persist_directory) and os.listdir(
-            persist_directory
-        )
+        # 空でないかは最初の1エントリだけ確認すれば十分（全件列挙しない）
+        chromadb_exists = False
+        if os.path.isdir(persist_directory):
+            with os.scandir(persist_directory) as entries:
+                chromadb_exists = next(entries, None) is not None
 
         if chromadb_exists:  # ChromaDBが存在し、空でない場合
             print(
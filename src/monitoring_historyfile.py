@@ -22,13 +22,20 @@ STEP 3: Background Processing
 """
 
 import os
+import re
 import sys
 import time
 import json
+import queue
+import fnmatch
+import hashlib
 import logging
+import threading
+import logging.handlers
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
-from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
 # Add current directory and parent directory to path for imports
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -36,11 +43,29 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.insert(0, current_dir)
 sys.path.insert(0, parent_dir)
 
+__all__ = [
+    "MonitoringConfig",
+    "ConversationFileHandler",
+    "ConversationMonitor",
+    "WATCHDOG_AVAILABLE",
+    "RAG_AVAILABLE",
+    "main",
+]
+
+logger = logging.getLogger(__name__)
+
 # Debug info only when running as main
 if __name__ == "__main__":
     print(f"[MONITOR] Starting monitoring from: {current_dir}")
     print(f"[MONITOR] Parent directory: {parent_dir}")
 
+try:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so handlers stay the same
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 try:
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler
@@ -51,6 +76,17 @@ except ImportError:
     if __name__ == "__main__":
         print("[WARNING] Watchdog not available - using polling mode")
     WATCHDOG_AVAILABLE = False
+    FileSystemEventHandler = object  # handler is still used by the polling path
+
+# On Linux prefer native inotify: IN_CLOSE_WRITE fires once per writer close
+# (on_closed) instead of once per write() (on_modified)
+CLOSE_WRITE_EVENTS = False
+if WATCHDOG_AVAILABLE and sys.platform.startswith("linux"):
+    try:
+        from watchdog.observers.inotify import InotifyObserver as Observer
+        CLOSE_WRITE_EVENTS = True
+    except Exception:
+        pass
 
 try:
     # Try multiple import paths
@@ -109,36 +145,64 @@ except Exception as e:
         print(f"[WARNING] Error importing RAG components: {e}")
     RAG_AVAILABLE = False
 # === STEP 4: Configuration ===
+@dataclass(slots=True, frozen=True)
 class MonitoringConfig:
     """
-    STEP 4.1: Monitoring configuration settings
+    STEP 4.1: Monitoring configuration settings (immutable; use
+    dataclasses.replace() or keyword arguments to override values)
     """
-    def __init__(self):
-        # Set paths relative to the current script location
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.dirname(current_dir)
-
-        self.watch_directory = os.path.join(parent_dir, "logs")
-        self.chroma_directory = os.path.join(parent_dir, "db", "chroma_store")
-        self.conversation_db = os.path.join(parent_dir, "db", "conversation_history.db")
-        self.polling_interval = 10  # seconds (reduced for more responsive monitoring)
-        self.log_file = os.path.join(parent_dir, "monitoring.log")
-
-        # File patterns to monitor (expanded for LINE Bot logs)
-        self.monitor_patterns = [
-            "*.log",
-            "conversation_*.json",
-            "history_*.txt",
-            "chat_history_*.json",
-            "line_chat_*.log",
-            "debug_*.log"
-        ]
+    # Paths relative to the project root (parent of this script's directory)
+    watch_directory: str = os.path.join(parent_dir, "logs")
+    chroma_directory: str = os.path.join(parent_dir, "db", "chroma_store")
+    conversation_db: str = os.path.join(parent_dir, "db", "conversation_history.db")
+    polling_interval: float = 10  # seconds (reduced for more responsive monitoring)
+    num_workers: int = 2  # background threads: one reads/parses while another inserts
+    queue_size: int = 1024  # pending file events before new ones are dropped
+    debounce_seconds: float = 0.25  # ignore repeated events for a file within this window
+    batch_window: float = 0.5  # seconds of queue quiescence before a burst is ingested
+    max_batch_files: int = 64  # upper bound on files coalesced into one RAG insert
+    max_retries: int = 3  # extra attempts for a failed RAG insert
+    retry_backoff: float = 1.0  # seconds before the first retry, doubled each attempt
+    dedupe_cache_size: int = 1_000_000  # content hashes of texts already sent to RAG
+    # Tune Chroma's embedded SQLite (WAL + synchronous=NORMAL); single writer only
+    aggressive_sqlite: bool = field(
+        default_factory=lambda: os.environ.get("MONITOR_AGGRESSIVE_SQLITE") == "1"
+    )
+    log_file: str = os.path.join(parent_dir, "monitoring.log")
+
+    # File patterns to monitor (expanded for LINE Bot logs)
+    monitor_patterns: Tuple[str, ...] = (
+        "*.log",
+        "conversation_*.json",
+        "history_*.txt",
+        "chat_history_*.json",
+        "line_chat_*.log",
+        "debug_*.log",
+    )
+
+    _pattern_re: re.Pattern = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # Precompile all patterns into one anchored alternation (glob semantics)
+        object.__setattr__(self, "_pattern_re", re.compile(
+            "|".join(fnmatch.translate(pattern) for pattern in self.monitor_patterns)
+        ))
 
         if __name__ == "__main__":
             print(f"[CONFIG] Watch directory: {self.watch_directory}")
             print(f"[CONFIG] ChromaDB directory: {self.chroma_directory}")
             print(f"[CONFIG] Polling interval: {self.polling_interval}s")
 
+    def should_process_file(self, file_path: str) -> bool:
+        """
+        STEP 4.2: Check if file path matches one of the monitor patterns
+        """
+        return self.matches_name(os.path.basename(file_path))
+
+    def matches_name(self, file_name: str) -> bool:
+        """Check a bare file name (e.g. DirEntry.name) against the monitor patterns"""
+        return self._pattern_re.match(file_name) is not None
+
 
 # === STEP 5: File System Event Handler ===
 class ConversationFileHandler(FileSystemEventHandler):
@@ -187,109 +251,386 @@ class ConversationFileHandler(FileSystemEventHandler):
                     print(f"[ERROR] Failed to initialize components: {e}")
                     print("[INFO] Continuing without RAG engine")
 
+        if config.aggressive_sqlite:
+            self._tune_chroma_sqlite()
+
+        # Watchdog delivers events on a single thread; parsing and RAG inserts
+        # run on worker threads so event delivery is never blocked
+        self._rag_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=config.queue_size)
+
+        # Files waiting in the queue, files being processed, and files that
+        # changed while being processed (re-queued once their job finishes),
+        # plus last event time per file, so bursts of modified events for one
+        # file collapse into a single job without losing later writes
+        self._inflight_lock = threading.Lock()
+        self._queued = set()
+        self._processing = set()
+        self._dirty = set()
+        self._last_seen: Dict[str, float] = {}
+        self._last_seen_pruned = time.monotonic()
+
+        # LRU of content hashes already ingested, so repeated log lines are
+        # not re-embedded (RAG engine assigns its own ids, so dedupe here)
+        self._seen_lock = threading.Lock()
+        self._seen_texts: "OrderedDict[bytes, None]" = OrderedDict()
+
+        # Job counters for status reporting (queued/dropped/ingested/failed...)
+        self._stats_lock = threading.Lock()
+        self._stats = Counter()
+        self._workers = [
+            threading.Thread(target=self._worker_loop, name=f"monitor-worker-{i}", daemon=True)
+            for i in range(config.num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def _chroma_connection(self):
+        """Return Chroma's pooled SQLite connection, or None if not reachable"""
+        try:
+            client = self.rag_engine.vector_db._client
+            return client._server._sysdb._conn_pool.connect()
+        except Exception:
+            return None
+
+    def _tune_chroma_sqlite(self):
+        """
+        STEP 5.1.1: Apply insert-friendly PRAGMAs to the embedded Chroma store
+        """
+        conn = self._chroma_connection()
+        if conn is None:
+            logger.info("Chroma SQLite connection not reachable - PRAGMA tuning skipped")
+            return
+
+        for pragma in ("journal_mode=WAL", "synchronous=NORMAL",
+                       "temp_store=memory", "cache_size=-262144"):
+            try:
+                conn.execute(f"PRAGMA {pragma}")
+            except Exception as e:
+                logger.warning("PRAGMA %s failed: %s", pragma, e)
+        logger.info("Applied SQLite PRAGMA tuning to Chroma store")
+
     def on_modified(self, event):
         """
         STEP 5.2: Handle file modification events
         """
-        if event.is_directory:
-            return
+        if event.is_directory or CLOSE_WRITE_EVENTS:
+            return  # with inotify, on_closed handles the finished write
 
         file_path = event.src_path
         if self._should_process_file(file_path):
-            print(f"[MONITOR] Processing modified file: {file_path}")
-            self._process_conversation_file(file_path)
+            self._enqueue(file_path)
 
     def on_created(self, event):
         """
         STEP 5.3: Handle file creation events
         """
+        if event.is_directory or CLOSE_WRITE_EVENTS:
+            return  # with inotify, on_closed fires once the writer is done
+
+        file_path = event.src_path
+        if self._should_process_file(file_path):
+            self._enqueue(file_path)
+
+    def on_moved(self, event):
+        """
+        STEP 5.3.0: Handle files renamed into place (iCloud sync, atomic writers)
+
+        These arrive as IN_MOVED_TO / rename events, never as created or
+        closed-after-write, so the destination path is queued here. Files
+        moved in from outside the watch tree have an empty src_path; files
+        moved out have an empty dest_path.
+        """
+        if event.is_directory or not event.dest_path:
+            return
+
+        file_path = event.dest_path
+        if self._should_process_file(file_path):
+            self._enqueue(file_path)
+
+    def on_closed(self, event):
+        """
+        STEP 5.3.1: Handle close-after-write events (inotify IN_CLOSE_WRITE)
+        """
         if event.is_directory:
             return
 
         file_path = event.src_path
         if self._should_process_file(file_path):
-            print(f"[MONITOR] Processing new file: {file_path}")
-            self._process_conversation_file(file_path)
+            self._enqueue(file_path)
+
+    def submit(self, file_path: str):
+        """
+        STEP 5.3.2: Queue a file for the workers, waiting while the queue is full
+        """
+        self._enqueue(file_path, block=True)
+
+    def _enqueue(self, file_path: str, block: bool = False):
+        """Hand a file over to the worker threads (event path never blocks)"""
+        now = time.monotonic()
+        with self._inflight_lock:
+            # Still waiting in the queue: the pending job will read the new content
+            if file_path in self._queued:
+                return
+            # Already being read: process it again once the current job finishes
+            if file_path in self._processing:
+                self._dirty.add(file_path)
+                return
+            if now - self._last_seen.get(file_path, float("-inf")) < self.config.debounce_seconds:
+                return
+            self._last_seen[file_path] = now
+            self._prune_last_seen(now)
+            self._queued.add(file_path)
+
+        self._put(file_path, block)
+
+    def _put(self, file_path: str, block: bool):
+        """Put a file already marked as queued onto the work queue"""
+        try:
+            self._queue.put(file_path, block=block)
+            self._count("files_queued")
+            logger.debug("Queued file: %s", file_path)
+        except queue.Full:
+            with self._inflight_lock:
+                self._queued.discard(file_path)
+            self._count("files_dropped")
+            logger.warning("Monitor queue full - dropping event for %s", file_path)
+
+    def _prune_last_seen(self, now: float):
+        """Forget event times older than the debounce window (caller holds _inflight_lock)"""
+        if now - self._last_seen_pruned < self.config.debounce_seconds:
+            return
+        cutoff = now - self.config.debounce_seconds
+        self._last_seen = {path: seen for path, seen in self._last_seen.items() if seen >= cutoff}
+        self._last_seen_pruned = now
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        STEP 5.3.3: Snapshot of job counters plus current queue depth
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        with self._inflight_lock:
+            stats["in_flight"] = len(self._queued) + len(self._processing)
+        return stats
+
+    def _worker_loop(self):
+        """Process queued files in coalesced batches until a None sentinel is received"""
+        while True:
+            batch = [self._queue.get()]
+
+            # Coalesce a burst: keep collecting until the queue has been quiet
+            # for batch_window seconds, so N new files cost one RAG insert
+            while batch[-1] is not None and len(batch) < self.config.max_batch_files:
+                try:
+                    batch.append(self._queue.get(timeout=self.config.batch_window))
+                except queue.Empty:
+                    break
+
+            file_paths = [file_path for file_path in batch if file_path is not None]
+            with self._inflight_lock:
+                self._queued.difference_update(file_paths)
+                self._processing.update(file_paths)
+            try:
+                if file_paths:
+                    self._process_files(file_paths)
+            except Exception as e:
+                logger.error("Worker failed on %s: %s", file_paths, e)
+            finally:
+                # Files written to while this batch ran go back on the queue
+                with self._inflight_lock:
+                    self._processing.difference_update(file_paths)
+                    requeue = [file_path for file_path in file_paths if file_path in self._dirty]
+                    self._dirty.difference_update(requeue)
+                    self._queued.update(requeue)
+                for file_path in requeue:
+                    self._put(file_path, block=False)
+                for _ in batch:
+                    self._queue.task_done()
+
+            if batch[-1] is None:
+                return
+
+    def stop(self):
+        """
+        STEP 5.8: Stop worker threads after queued files are processed
+        """
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+        # Files re-queued behind the stop sentinels are processed here
+        leftover = []
+        while True:
+            try:
+                file_path = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if file_path is not None:
+                leftover.append(file_path)
+            self._queue.task_done()
+        if leftover:
+            with self._inflight_lock:
+                self._queued.difference_update(leftover)
+            try:
+                self._process_files(leftover)
+            except Exception as e:
+                logger.error("Failed on %s while stopping: %s", leftover, e)
 
     def _should_process_file(self, file_path: str) -> bool:
         """
         STEP 5.4: Check if file should be processed
         """
-        file_name = os.path.basename(file_path)
-        for pattern in self.config.monitor_patterns:
-            if pattern.replace("*", "") in file_name:
-                return True
-        return False
+        return self.config.should_process_file(file_path)
 
     def _process_conversation_file(self, file_path: str):
         """
         STEP 5.5: Process conversation file content
         """
-        try:
-            if not os.path.exists(file_path):
-                print(f"[MONITOR] File does not exist: {file_path}")
+        self._process_files([file_path])
+
+    def _process_files(self, file_paths: List[str]):
+        """
+        STEP 5.5.0: Read and parse files, then add them with a single RAG insert
+        """
+        pairs = []
+        for file_path in file_paths:
+            pairs.extend(self._collect_conversations(file_path))
+
+        if not pairs:
+            logger.debug("No valid texts to add")
+            return
+        if not self.rag_engine:
+            logger.debug("RAG engine not available - skipping document addition")
+            return
+
+        pairs, digests = self._filter_seen_texts(pairs)
+        if not pairs:
+            logger.debug("All texts already ingested")
+            return
+        texts, metadatas = map(list, zip(*pairs))
+        self._count("files_processed", len(file_paths))
+
+        for attempt in range(self.config.max_retries + 1):
+            if attempt:
+                self._count("insert_retries")
+                time.sleep(self.config.retry_backoff * 2 ** (attempt - 1))
+            try:
+                success = self._add_to_rag(texts, metadatas)
+            except Exception as rag_error:
+                logger.error("RAG engine error: %s", rag_error)
+                success = False
+            if success is None:
+                return
+            if success:
+                self._remember_texts(digests)
+                self._count("documents_added", len(texts))
+                logger.info("Added %d conversations from %d file(s) to RAG engine",
+                            len(texts), len(file_paths))
                 return
 
-            print(f"[MONITOR] Processing file: {file_path}")
+        self._count("insert_failures")
+        logger.warning("Failed to add conversations from %s to RAG engine after %d attempts",
+                       file_paths, self.config.max_retries + 1)
+
+    def _add_to_rag(self, texts: List[str], metadatas: List[Dict]) -> Optional[bool]:
+        """Insert one batch; returns None if the engine cannot store documents at all"""
+        if getattr(self.rag_engine, "vector_db", True) is None:
+            logger.debug("RAG engine has no vector DB (limited mode) - skipping insert")
+            return None
+        # Try different methods to add documents (engine is not thread-safe)
+        with self._rag_lock:
+            if hasattr(self.rag_engine, 'add_documents'):
+                return bool(self.rag_engine.add_documents(texts, metadatas))
+            if hasattr(self.rag_engine, 'add_texts'):
+                return bool(self.rag_engine.add_texts(texts, metadatas))
+        logger.warning("RAG engine doesn't have recognized add method")
+        return None
+
+    def _collect_conversations(self, file_path: str) -> List[Tuple[str, Dict]]:
+        """
+        STEP 5.5.1: Read one file and return (text, metadata) pairs to ingest
+        """
+        try:
+            logger.debug("Processing file: %s", file_path)
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = self._read_text(file_path)
+            if content is None:
+                return []
 
             if not content.strip():
-                print(f"[MONITOR] File is empty: {file_path}")
-                return
+                logger.debug("File is empty: %s", file_path)
+                return []
 
-            print(f"[MONITOR] File content length: {len(content)} characters")
+            logger.debug("File content length: %d characters", len(content))
 
             # Parse conversation data
             conversations = self._parse_conversation_content(content)
-            print(f"[MONITOR] Parsed {len(conversations)} conversations")
-
-            if conversations and self.rag_engine:
-                # Add to RAG engine
-                texts = [conv.get('text', '') for conv in conversations if conv.get('text') and len(conv.get('text', '').strip()) > 0]
-                metadatas = [{'source': file_path, 'timestamp': conv.get('timestamp', datetime.now().isoformat())}
-                           for conv in conversations if conv.get('text') and len(conv.get('text', '').strip()) > 0]
-
-                if texts:
-                    try:
-                        # Try different methods to add documents
-                        if hasattr(self.rag_engine, 'add_documents'):
-                            success = self.rag_engine.add_documents(texts, metadatas)
-                        elif hasattr(self.rag_engine, 'add_texts'):
-                            success = self.rag_engine.add_texts(texts, metadatas)
-                        else:
-                            print("[MONITOR] RAG engine doesn't have recognized add method")
-                            return
-
-                        if success:
-                            print(f"[MONITOR] Successfully added {len(texts)} conversations to RAG engine")
-                        else:
-                            print(f"[MONITOR] Failed to add conversations to RAG engine")
-                    except Exception as rag_error:
-                        print(f"[ERROR] RAG engine error: {rag_error}")
-                else:
-                    print("[MONITOR] No valid texts to add")
-            elif not self.rag_engine:
-                print("[MONITOR] RAG engine not available - skipping document addition")
-            else:
-                print("[MONITOR] No conversations to process")
+            logger.debug("Parsed %d conversations", len(conversations))
 
+            # Single pass, one timestamp snapshot per file
+            now_iso = datetime.now().isoformat()
+            return [(text, {'source': file_path, 'timestamp': conv.get('timestamp', now_iso)})
+                    for conv in conversations
+                    if (text := (conv.get('text') or '').strip())]
+
+        except Exception as e:
+            logger.exception("Failed to process file %s: %s", file_path, e)
+            return []
+
+    def _read_text(self, file_path: str) -> Optional[str]:
+        """Read a file as UTF-8, falling back to common Japanese encodings"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            logger.debug("File does not exist: %s", file_path)
+            return None
         except UnicodeDecodeError as e:
-            print(f"[ERROR] Unicode decode error in file {file_path}: {e}")
-            # Try with different encodings
-            for encoding in ['utf-8-sig', 'shift_jis', 'cp932']:
-                try:
-                    with open(file_path, 'r', encoding=encoding) as f:
-                        content = f.read()
-                    print(f"[MONITOR] Successfully read with {encoding} encoding")
-                    break
-                except UnicodeDecodeError:
+            logger.warning("Unicode decode error in file %s: %s", file_path, e)
+
+        # Try with different encodings
+        for encoding in ['utf-8-sig', 'shift_jis', 'cp932']:
+            try:
+                with open(file_path, 'r', encoding=encoding) as f:
+                    content = f.read()
+                logger.info("Successfully read %s with %s encoding", file_path, encoding)
+                return content
+            except UnicodeDecodeError:
+                continue
+        return None
+
+    def _filter_seen_texts(self, pairs: List[Tuple[str, Dict]]) -> Tuple[List[Tuple[str, Dict]], List[bytes]]:
+        """
+        STEP 5.5.2: Drop texts already ingested or repeated within this batch
+        """
+        fresh, digests, batch = [], [], set()
+        with self._seen_lock:
+            for text, metadata in pairs:
+                digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+                if digest in batch:
                     continue
-        except Exception as e:
-            print(f"[ERROR] Failed to process file {file_path}: {e}")
-            import traceback
-            traceback.print_exc()
+                if digest in self._seen_texts:
+                    self._seen_texts.move_to_end(digest)
+                    continue
+                batch.add(digest)
+                fresh.append((text, metadata))
+                digests.append(digest)
+        return fresh, digests
+
+    def _remember_texts(self, digests: List[bytes]):
+        """Record successfully ingested content hashes, evicting the oldest"""
+        with self._seen_lock:
+            for digest in digests:
+                self._seen_texts[digest] = None
+            while len(self._seen_texts) > self.config.dedupe_cache_size:
+                self._seen_texts.popitem(last=False)
 
     def _parse_conversation_content(self, content: str) -> List[Dict]:
         """
@@ -299,36 +640,31 @@ class ConversationFileHandler(FileSystemEventHandler):
 
         try:
             # Try JSON format first
-            if content.strip().startswith('{') or content.strip().startswith('['):
-                data = json.loads(content)
+            if content.lstrip()[:1] in ('{', '['):
+                data = _json_loads(content)
                 if isinstance(data, list):
                     conversations = data
                 elif isinstance(data, dict):
                     conversations = [data]
             else:
                 # Try plain text format
-                lines = content.split('\n')
-                for line in lines:
-                    line = line.strip()
-                    if line and len(line) > 10:  # Filter out short lines
-                        conversations.append({
-                            'text': line,
-                            'timestamp': datetime.now().isoformat()
-                        })
+                conversations = self._parse_text_lines(content)
 
         except json.JSONDecodeError:
             # Fallback to line-by-line processing
-            lines = content.split('\n')
-            for line in lines:
-                line = line.strip()
-                if line and len(line) > 10:
-                    conversations.append({
-                        'text': line,
-                        'timestamp': datetime.now().isoformat()
-                    })
+            conversations = self._parse_text_lines(content)
 
         return conversations
 
+    def _parse_text_lines(self, content: str) -> List[Dict]:
+        """
+        STEP 5.7: Convert plain text into one conversation per non-trivial line
+        """
+        timestamp = datetime.now().isoformat()
+        return [{'text': line, 'timestamp': timestamp}
+                for line in map(str.strip, content.split('\n'))
+                if len(line) > 10]  # Filter out short lines
+
 
 # === STEP 6: Main Monitoring Class ===
 class ConversationMonitor:
@@ -341,44 +677,86 @@ class ConversationMonitor:
         self.observer = None
         self.event_handler = None
 
-        # Setup logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.config.log_file),
-                logging.StreamHandler()
-            ]
+        # Polling cursor: directory -> (mtime, subdirectories) from the last scan
+        self._dir_cache: Dict[str, tuple] = {}
+
+        # Set by stop(); the watchdog/polling loops wait on it instead of sleeping
+        self._stop_event = threading.Event()
+
+        # Setup logging: records are queued and written by a background
+        # listener so file/console I/O never runs on the event hot path.
+        # Only this module's logger is configured so that running embedded in
+        # the bot process (uma3.py) does not take over the app's root logger.
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+        output_handlers = [
+            logging.FileHandler(self.config.log_file),
+            logging.StreamHandler()
+        ]
+        for handler in output_handlers:
+            handler.setFormatter(formatter)
+        log_queue = queue.Queue(-1)
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue, *output_handlers, respect_handler_level=True
         )
-        self.logger = logging.getLogger(__name__)
+        for handler in [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+            logger.removeHandler(handler)
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        self.logger = logger
 
     def start_monitoring(self):
         """
         STEP 6.2: Start file monitoring
         """
-        print(f"[MONITOR] Starting conversation file monitoring...")
-        print(f"[MONITOR] Watch directory: {self.config.watch_directory}")
-        print(f"[MONITOR] Monitor patterns: {self.config.monitor_patterns}")
+        self._stop_event.clear()
+        self._log_listener.start()
+        try:
+            self._run_monitoring()
+        finally:
+            self._log_listener.stop()
+
+    def stop(self):
+        """
+        STEP 6.6: Request the running watchdog/polling loop to exit
+
+        Safe to call from any thread; start_monitoring() returns once the
+        observer and queued work have been shut down.
+        """
+        self._stop_event.set()
+
+    def is_running(self) -> bool:
+        """Return True while start_monitoring() is active and not asked to stop"""
+        return self.event_handler is not None and not self._stop_event.is_set()
+
+    def _run_monitoring(self):
+        """Verify the watch directory and run the watchdog or polling loop"""
+        self.logger.info("Starting conversation file monitoring")
+        self.logger.info("Watch directory: %s", self.config.watch_directory)
+        self.logger.info("Monitor patterns: %s", self.config.monitor_patterns)
 
         # Create watch directory if it doesn't exist
         try:
             os.makedirs(self.config.watch_directory, exist_ok=True)
-            print(f"[MONITOR] Created/verified watch directory: {self.config.watch_directory}")
+            self.logger.info("Created/verified watch directory: %s", self.config.watch_directory)
         except Exception as e:
-            print(f"[ERROR] Failed to create watch directory: {e}")
+            self.logger.error("Failed to create watch directory: %s", e)
             return
 
         # Check if directory exists and is readable
         if not os.path.exists(self.config.watch_directory):
-            print(f"[ERROR] Watch directory does not exist: {self.config.watch_directory}")
+            self.logger.error("Watch directory does not exist: %s", self.config.watch_directory)
             return
 
         if not os.access(self.config.watch_directory, os.R_OK):
-            print(f"[ERROR] Watch directory is not readable: {self.config.watch_directory}")
+            self.logger.error("Watch directory is not readable: %s", self.config.watch_directory)
             return
 
-        print(f"[MONITOR] Watchdog available: {WATCHDOG_AVAILABLE}")
-        print(f"[MONITOR] RAG available: {RAG_AVAILABLE}")
+        self.logger.info("Watchdog available: %s", WATCHDOG_AVAILABLE)
+        self.logger.info("RAG available: %s", RAG_AVAILABLE)
+
+        # Shared handler (and RAG engine) for both watchdog and polling paths
+        self.event_handler = ConversationFileHandler(self.config)
 
         if WATCHDOG_AVAILABLE:
             self._start_watchdog_monitoring()
@@ -390,8 +768,9 @@ class ConversationMonitor:
         STEP 6.3: Start watchdog-based monitoring
         """
         try:
-            self.event_handler = ConversationFileHandler(self.config)
-            self.observer = Observer()
+            # Full events report moves from outside the tree as moves (not
+            # creations), so on_moved sees them while on_created is skipped
+            self.observer = Observer(generate_full_events=True) if CLOSE_WRITE_EVENTS else Observer()
             self.observer.schedule(
                 self.event_handler,
                 self.config.watch_directory,
@@ -399,77 +778,131 @@ class ConversationMonitor:
             )
 
             self.observer.start()
-            print("[MONITOR] Watchdog monitoring started")
+            self.logger.info("Watchdog monitoring started")
 
             try:
-                while True:
-                    time.sleep(1)
+                # Short timeout keeps Ctrl+C responsive on platforms where an
+                # untimed wait cannot be interrupted
+                while not self._stop_event.wait(1):
+                    pass
             except KeyboardInterrupt:
-                print("[MONITOR] Stopping monitoring...")
-                self.observer.stop()
+                pass
 
+            self.logger.info("Stopping monitoring")
+            self.observer.stop()
             self.observer.join()
+            self.event_handler.stop()
 
         except Exception as e:
-            print(f"[ERROR] Watchdog monitoring failed: {e}")
+            self.logger.error("Watchdog monitoring failed: %s", e)
             self._start_polling_monitoring()
 
     def _start_polling_monitoring(self):
         """
         STEP 6.4: Start polling-based monitoring
         """
-        print("[MONITOR] Starting polling-based monitoring")
+        self.logger.info("Starting polling-based monitoring")
         processed_files = set()
 
         try:
-            while True:
+            while not self._stop_event.is_set():
                 try:
-                    # Scan for new files
-                    watch_path = Path(self.config.watch_directory)
-                    if watch_path.exists():
-                        for file_path in watch_path.rglob("*"):
-                            if file_path.is_file():
-                                file_str = str(file_path)
-                                if (file_str not in processed_files and
-                                    self._should_process_file(file_str)):
-                                    print(f"[MONITOR] Processing: {file_str}")
-                                    self._process_file(file_str)
-                                    processed_files.add(file_str)
-
-                    time.sleep(self.config.polling_interval)
+                    # Scan for new files (only directories whose entries changed)
+                    for file_str in self._scan_changed_directories():
+                        if file_str not in processed_files:
+                            self.logger.debug("Detected: %s", file_str)
+                            self._process_file(file_str)
+                            processed_files.add(file_str)
+
+                    if self._stop_event.wait(self.config.polling_interval):
+                        break
 
                 except KeyboardInterrupt:
-                    print("[MONITOR] Stopping polling monitoring...")
+                    self.logger.info("Stopping polling monitoring")
                     break
                 except Exception as e:
-                    print(f"[ERROR] Polling error: {e}")
-                    time.sleep(self.config.polling_interval)
+                    self.logger.error("Polling error: %s", e)
+                    self._stop_event.wait(self.config.polling_interval)
 
         except Exception as e:
-            print(f"[ERROR] Monitoring failed: {e}")
+            self.logger.error("Monitoring failed: %s", e)
+        finally:
+            if self.event_handler is not None:
+                self.event_handler.stop()
 
-    def _should_process_file(self, file_path: str) -> bool:
-        """Check if file should be processed"""
-        file_name = os.path.basename(file_path)
-        for pattern in self.config.monitor_patterns:
-            if pattern.replace("*", "") in file_name:
-                return True
-        return False
+    def _scan_changed_directories(self) -> List[str]:
+        """
+        STEP 6.5: List monitored files in directories whose mtime changed since last scan
+
+        A directory's mtime only changes when entries are added, removed or
+        renamed, so unchanged directories are not re-listed; their cached
+        subdirectories are still stat'ed to pick up nested changes.
+        """
+        files = []
+        stack = [self.config.watch_directory]
+
+        while stack:
+            directory = stack.pop()
+            try:
+                dir_mtime = os.stat(directory).st_mtime
+            except OSError:
+                self._dir_cache.pop(directory, None)
+                continue
+
+            cached = self._dir_cache.get(directory)
+            if cached is not None and cached[0] == dir_mtime:
+                stack.extend(cached[1])
+                continue
+
+            subdirs = []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                        elif (entry.is_file(follow_symlinks=False) and
+                              self.config.matches_name(entry.name)):
+                            files.append(entry.path)
+            except OSError as e:
+                self.logger.error("Failed to scan %s: %s", directory, e)
+                continue
+
+            self._dir_cache[directory] = (dir_mtime, subdirs)
+            stack.extend(subdirs)
+
+        return files
 
     def _process_file(self, file_path: str):
-        """Process individual file"""
+        """Queue individual file; workers read/parse it while earlier files are ingested"""
         try:
             if not RAG_AVAILABLE:
                 return
 
-            handler = ConversationFileHandler(self.config)
-            handler._process_conversation_file(file_path)
+            if self.event_handler is None:
+                self.event_handler = ConversationFileHandler(self.config)
+            self.event_handler.submit(file_path)
 
         except Exception as e:
-            print(f"[ERROR] Failed to process {file_path}: {e}")
+            self.logger.error("Failed to process %s: %s", file_path, e)
 
 
 # === STEP 7: Entry Point ===
+def _lower_process_priority():
+    """
+    STEP 7.0: Run the monitor as low-priority background work on one CPU so it
+    does not compete with RAG inference (opt-in via MONITOR_LOW_PRIORITY=1)
+    """
+    try:
+        if hasattr(os, "nice"):
+            os.nice(10)
+        if hasattr(os, "sched_setaffinity"):
+            cpus = os.sched_getaffinity(0)
+            os.sched_setaffinity(0, {max(cpus)})
+        print("[MONITOR] Running with lowered priority")
+    except OSError as e:
+        print(f"[WARNING] Could not lower monitor priority: {e}")
+
+
 def main():
     """
     STEP 7.1: Main entry point for monitoring process
@@ -477,6 +910,9 @@ def main():
     print("=== Uma3 Conversation File Monitor ===")
     print(f"Started at: {datetime.now()}")
 
+    if os.environ.get("MONITOR_LOW_PRIORITY") == "1":
+        _lower_process_priority()
+
     try:
         config = MonitoringConfig()
         monitor = ConversationMonitor(config)
@@ -9,13 +9,29 @@ LINE ノート投稿検出システム
 import re
 import json
 import os
+import heapq
+import hashlib
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 
-@dataclass
+try:
+    # orjsonがあれば保存/読み込みを高速化（出力はUTF-8そのまま）
+    import orjson
+
+    def _dump_notes(notes: List[dict]) -> bytes:
+        return orjson.dumps(notes, option=orjson.OPT_INDENT_2)
+
+    _json_loads = orjson.loads
+except ImportError:
+    def _dump_notes(notes: List[dict]) -> bytes:
+        return json.dumps(notes, ensure_ascii=False, indent=2).encode('utf-8')
+
+    _json_loads = json.loads
+
+@dataclass(slots=True, frozen=True)
 class NoteInfo:
-    """ノート情報データクラス"""
+    """ノート情報データクラス（登録後は変更しない）"""
     note_id: str
     note_url: str
     group_id: str
@@ -24,10 +40,52 @@ class NoteInfo:
     title: str
     detected_at: str
     message_text: str
+    chouseisan_url: Optional[str] = None
+
+    def __post_init__(self):
+        # 本文は変更されないので調整さんURLは生成時に一度だけ抽出しておく
+        if self.chouseisan_url is None:
+            match = NoteDetector.CHOUSEISAN_PATTERN.search(self.message_text)
+            if match:
+                object.__setattr__(self, 'chouseisan_url', match.group(0))
+
+    def to_dict(self) -> dict:
+        """保存/返却用の辞書に変換（asdictの再帰コピーを避けて直接生成）"""
+        return {
+            'note_id': self.note_id,
+            'note_url': self.note_url,
+            'group_id': self.group_id,
+            'user_id': self.user_id,
+            'user_name': self.user_name,
+            'title': self.title,
+            'detected_at': self.detected_at,
+            'message_text': self.message_text,
+            'chouseisan_url': self.chouseisan_url,
+        }
+
+def _detected_at(note: NoteInfo) -> str:
+    """新しい順の並べ替えに使う検出日時キー"""
+    return note.detected_at
 
 class NoteDetector:
     """LINE ノート投稿検出クラス"""
 
+    # ノート投稿通知のパターン（日本語/英語・絵文字・敬称を1パスで判定）
+    NOTIFICATION_RE = re.compile(
+        r'(?:📝\s*)?(?P<name>.+?)(?:さん)?(?:がノートを投稿しました| posted a note)'
+    )
+
+    # ノートURLパターン（URL全体とノートIDを同時に抽出）
+    URL_RE = re.compile(r'https://line\.me/R/(?:home/)?note/(?P<gid>[^/]+)/(?P<nid>[^/?]+)')
+
+    # タイトル候補行（空行・ノート投稿通知・URLを含む行以外の最初の行）
+    TITLE_RE = re.compile(
+        r'^(?![^\n]*(?:がノートを投稿しました|https://))[^\S\n]*(\S[^\n]*)', re.MULTILINE
+    )
+
+    # 調整さんURLパターン（&acs=1 付きも同じパターンで先頭一致する）
+    CHOUSEISAN_PATTERN = re.compile(r'https?://chouseisan\.com/s\?h=([\w\d]+)')
+
     def __init__(self, storage_file: str = "detected_notes.json"):
         """
         初期化
@@ -36,51 +94,50 @@ class NoteDetector:
             storage_file (str): ノート情報保存ファイル
         """
         self.storage_file = storage_file
-        self.notes_db = []
+        self.notes_by_id: Dict[str, NoteInfo] = {}
+        # タイトル検索用の小文字化済みタイトル（note_id -> title.lower()）
+        self._lower_titles: Dict[str, str] = {}
         self.load_notes_db()
 
-        # ノート投稿通知のパターン
-        self.note_patterns = [
-            # 標準的なノート投稿通知
-            r'(.+)がノートを投稿しました',
-            r'(.+) posted a note',
-            r'(.+)さんがノートを投稿しました',
-            r'📝\s*(.+)がノートを投稿しました',
-
-            # ノートURL直接投稿
-            r'https://line\.me/R/note/([^/]+)/([^/?]+)',
-            r'https://line\.me/R/home/note/([^/]+)/([^/?]+)',
-        ]
-
-        # 調整さんURLパターン
-        self.chouseisan_patterns = [
-            r'https?://chouseisan\.com/s\?h=([\w\d]+)',
-            r'https?://chouseisan\.com/s\?h=([\w\d]+)&acs=1',
-        ]
+        print(f"[NOTE_DETECTOR] 初期化完了 - 保存済みノート数: {len(self.notes_by_id)}")
 
-        print(f"[NOTE_DETECTOR] 初期化完了 - 保存済みノート数: {len(self.notes_db)}")
+    @property
+    def notes_db(self) -> List[NoteInfo]:
+        """保存済みノートの一覧（登録順のコピー）"""
+        return list(self.notes_by_id.values())
 
     def load_notes_db(self):
         """保存されたノート情報を読み込み"""
         try:
             if os.path.exists(self.storage_file):
-                with open(self.storage_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.notes_db = [NoteInfo(**item) for item in data]
-                print(f"[NOTE_DETECTOR] ノート情報読み込み完了: {len(self.notes_db)}件")
+                with open(self.storage_file, 'rb') as f:
+                    data = _json_loads(f.read())
+                self.notes_by_id = {}
+                for item in data:
+                    note = NoteInfo(**item)
+                    # 既存ファイルに重複があれば先に登録されたものを残す
+                    self.notes_by_id.setdefault(note.note_id, note)
+                self._lower_titles = {
+                    note_id: note.title.lower() for note_id, note in self.notes_by_id.items()
+                }
+                print(f"[NOTE_DETECTOR] ノート情報読み込み完了: {len(self.notes_by_id)}件")
             else:
                 print(f"[NOTE_DETECTOR] 新規データベース作成")
         except Exception as e:
             print(f"[NOTE_DETECTOR] データベース読み込みエラー: {e}")
-            self.notes_db = []
+            self.notes_by_id = {}
+            self._lower_titles = {}
 
     def save_notes_db(self):
-        """ノート情報をファイルに保存"""
+        """ノート情報をファイルに保存（一時ファイル経由で置き換え）"""
+        tmp_file = self.storage_file + ".tmp"
         try:
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump([asdict(note) for note in self.notes_db], f,
-                         ensure_ascii=False, indent=2)
-            print(f"[NOTE_DETECTOR] ノート情報保存完了: {len(self.notes_db)}件")
+            data = _dump_notes([note.to_dict() for note in self.notes_by_id.values()])
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            # 書き込み途中でクラッシュしても既存ファイルを壊さない
+            os.replace(tmp_file, self.storage_file)
+            print(f"[NOTE_DETECTOR] ノート情報保存完了: {len(self.notes_by_id)}件")
         except Exception as e:
             print(f"[NOTE_DETECTOR] データベース保存エラー: {e}")
 
@@ -100,153 +157,115 @@ class NoteDetector:
         """
         print(f"[NOTE_DETECTOR] メッセージ検出開始: {message_text[:50]}...")
 
-        # ノート投稿通知の検出
-        for pattern in self.note_patterns:
-            match = re.search(pattern, message_text)
-            if match:
-                print(f"[NOTE_DETECTOR] ノート投稿通知検出: パターン={pattern}")
-
-                # ユーザー名を抽出（パターンに含まれる場合）
-                if match.groups():
-                    detected_user_name = match.group(1)
-                else:
-                    detected_user_name = user_name
-
-                # ノートURLを同じメッセージから探す
-                note_url = self.extract_note_url(message_text)
-
-                if note_url:
-                    note_id = self.extract_note_id_from_url(note_url)
-
-                    note_info = NoteInfo(
-                        note_id=note_id,
-                        note_url=note_url,
-                        group_id=group_id or user_id,
-                        user_id=user_id,
-                        user_name=detected_user_name,
-                        title=self.extract_note_title(message_text),
-                        detected_at=datetime.now().isoformat(),
-                        message_text=message_text
-                    )
-
-                    # データベースに追加
-                    self.add_note_to_db(note_info)
-
-                    return note_info
-
-        # 直接ノートURLが投稿された場合
-        note_url = self.extract_note_url(message_text)
-        if note_url:
+        # ノートURLがなければノートとして登録しない
+        url_match = self.URL_RE.search(message_text)
+        if not url_match:
+            return None
+
+        note_url = url_match.group(0)
+        note_id = url_match.group('nid')
+
+        # 登録済みノートならタイトル抽出や日時生成を行わずに既存情報を返す
+        existing_note = self.notes_by_id.get(note_id)
+        if existing_note is not None:
+            print(f"[NOTE_DETECTOR] 重複ノートをスキップ: {note_id}")
+            return existing_note
+
+        # ノート投稿通知の検出（ユーザー名を通知文から抽出）
+        notification = self.NOTIFICATION_RE.search(message_text)
+        if notification:
+            print(f"[NOTE_DETECTOR] ノート投稿通知検出: {notification.group(0)}")
+            detected_user_name = notification.group('name')
+        else:
+            # 直接ノートURLが投稿された場合
             print(f"[NOTE_DETECTOR] ノートURL直接投稿検出: {note_url}")
+            detected_user_name = user_name
+
+        note_info = NoteInfo(
+            note_id=note_id,
+            note_url=note_url,
+            group_id=group_id or user_id,
+            user_id=user_id,
+            user_name=detected_user_name,
+            title=self.extract_note_title(message_text),
+            detected_at=datetime.now().isoformat(),
+            message_text=message_text
+        )
 
-            note_id = self.extract_note_id_from_url(note_url)
-
-            note_info = NoteInfo(
-                note_id=note_id,
-                note_url=note_url,
-                group_id=group_id or user_id,
-                user_id=user_id,
-                user_name=user_name,
-                title=self.extract_note_title(message_text),
-                detected_at=datetime.now().isoformat(),
-                message_text=message_text
-            )
-
-            # データベースに追加
-            self.add_note_to_db(note_info)
-
-            return note_info
+        # データベースに追加
+        self.add_note_to_db(note_info)
 
-        return None
+        return note_info
 
     def extract_note_url(self, text: str) -> Optional[str]:
         """テキストからノートURLを抽出"""
-        patterns = [
-            r'(https://line\.me/R/note/[^/]+/[^/?]+)',
-            r'(https://line\.me/R/home/note/[^/]+/[^/?]+)',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(1)
+        match = self.URL_RE.search(text)
+        if match:
+            return match.group(0)
 
         return None
 
     def extract_note_id_from_url(self, url: str) -> str:
         """ノートURLからノートIDを抽出"""
-        patterns = [
-            r'https://line\.me/R/note/[^/]+/([^/?]+)',
-            r'https://line\.me/R/home/note/[^/]+/([^/?]+)',
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
+        match = self.URL_RE.search(url)
+        if match:
+            return match.group('nid')
 
         # URLからIDが抽出できない場合はURL全体をハッシュ化
-        import hashlib
-        return hashlib.md5(url.encode('utf-8')).hexdigest()[:16]
+        return hashlib.blake2b(url.encode('utf-8'), digest_size=8).hexdigest()
 
     def extract_note_title(self, text: str) -> str:
         """メッセージからノートタイトルを推測"""
-        lines = text.split('\n')
-
         # 最初の行をタイトルとして使用（ノート投稿通知以外）
-        for line in lines:
-            line = line.strip()
-            if line and 'がノートを投稿しました' not in line and 'https://' not in line:
-                return line[:50]  # 最大50文字
+        match = self.TITLE_RE.search(text)
+        if match:
+            return match.group(1).strip()[:50]  # 最大50文字
 
         return "ノート"  # デフォルトタイトル
 
     def extract_chouseisan_url(self, text: str) -> Optional[str]:
         """テキストから調整さんURLを抽出"""
-        for pattern in self.chouseisan_patterns:
-            match = re.search(pattern, text)
-            if match:
-                return match.group(0)
+        match = self.CHOUSEISAN_PATTERN.search(text)
+        if match:
+            return match.group(0)
 
         return None
 
     def add_note_to_db(self, note_info: NoteInfo):
         """ノート情報をデータベースに追加（重複チェック付き）"""
         # 重複チェック
-        for existing_note in self.notes_db:
-            if existing_note.note_id == note_info.note_id:
-                print(f"[NOTE_DETECTOR] 重複ノートをスキップ: {note_info.note_id}")
-                return
+        if note_info.note_id in self.notes_by_id:
+            print(f"[NOTE_DETECTOR] 重複ノートをスキップ: {note_info.note_id}")
+            return
 
         # 新規追加
-        self.notes_db.append(note_info)
+        self.notes_by_id[note_info.note_id] = note_info
+        self._lower_titles[note_info.note_id] = note_info.title.lower()
         self.save_notes_db()
         print(f"[NOTE_DETECTOR] 新規ノート登録: {note_info.title} ({note_info.note_id})")
 
     def get_latest_notes(self, limit: int = 5) -> List[dict]:
         """最新のノートを取得（辞書形式で返す）"""
-        latest = sorted(self.notes_db, key=lambda x: x.detected_at, reverse=True)[:limit]
-        return [asdict(note) for note in latest]
+        latest = heapq.nlargest(limit, self.notes_by_id.values(), key=_detected_at)
+        return [note.to_dict() for note in latest]
 
     def search_notes_by_title(self, keyword: str) -> List[dict]:
         """タイトルでノートを検索する（リマインダー関連付け用）"""
         keyword_lower = keyword.lower()
-        results = []
-
-        for note in self.notes_db:
-            title = note.title.lower()
-
-            if keyword_lower in title:
-                results.append(asdict(note))
+        matched = [
+            self.notes_by_id[note_id]
+            for note_id, title_lower in self._lower_titles.items()
+            if keyword_lower in title_lower
+        ]
 
         # 日時でソート（新しいものから）
-        results.sort(key=lambda x: x.get('detected_at', ''), reverse=True)
-        return results
+        matched.sort(key=_detected_at, reverse=True)
+        return [note.to_dict() for note in matched]
 
     def get_notes_by_group(self, group_id: str, limit: int = 10) -> List[NoteInfo]:
         """特定グループのノート情報を取得"""
-        group_notes = [note for note in self.notes_db if note.group_id == group_id]
-        return sorted(group_notes, key=lambda x: x.detected_at, reverse=True)[:limit]
+        group_notes = (note for note in self.notes_by_id.values() if note.group_id == group_id)
+        return heapq.nlargest(limit, group_notes, key=_detected_at)
 
     def get_chouseisan_urls(self, recent_only: bool = True) -> List[Tuple[str, str]]:
         """
@@ -261,25 +280,25 @@ class NoteDetector:
         chouseisan_urls = []
 
         if recent_only:
-            notes_to_check = sorted(self.notes_db, key=lambda x: x.detected_at, reverse=True)[:20]
+            notes_to_check = heapq.nlargest(20, self.notes_by_id.values(), key=_detected_at)
         else:
-            notes_to_check = self.notes_db
+            notes_to_check = self.notes_by_id.values()
 
         for note in notes_to_check:
-            chouseisan_url = self.extract_chouseisan_url(note.message_text)
-            if chouseisan_url:
-                chouseisan_urls.append((note.title, chouseisan_url))
+            if note.chouseisan_url:
+                chouseisan_urls.append((note.title, note.chouseisan_url))
 
         return chouseisan_urls
 
     def generate_notes_summary(self) -> str:
         """ノート情報のサマリーを生成"""
-        if not self.notes_db:
+        if not self.notes_by_id:
             return "📝 検出されたノートはありません。"
 
-        latest_notes = self.get_latest_notes(5)
+        # 辞書に変換せずNoteInfoのまま扱う
+        latest_notes = heapq.nlargest(5, self.notes_by_id.values(), key=_detected_at)
 
-        summary = f"📝 **検出済みノート情報** (総数: {len(self.notes_db)}件)\n\n"
+        summary = f"📝 **検出済みノート情報** (総数: {len(self.notes_by_id)}件)\n\n"
 
         for i, note in enumerate(latest_notes, 1):
             detected_date = datetime.fromisoformat(note.detected_at).strftime("%Y/%m/%d %H:%M")
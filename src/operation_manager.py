@@ -6,12 +6,15 @@ Uma3 Software 機械学習システム運用管理ツール
 """
 
 import os
+import re
 import sys
 import json
 import logging
 import subprocess
+import threading
 import time
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime
 from pathlib import Path
 import argparse
 import psutil
@@ -33,6 +36,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 運用に必要な学習済みモデル
+REQUIRED_MODELS = (
+    'classification_model.pkl',
+    'clustering_model.pkl',
+    'vectorizer.pkl',
+    'scaler.pkl'
+)
+
+# システム状況レポートの保存先（logs配下）
+REPORT_DB_NAME = 'operation_reports.db'
+
+# 統合テスト出力の指標行（3種類を1回の走査で判定）
+_SENTINEL_RE = re.compile(r'(?P<key>🎯 成功テスト|⚡ 分類精度|📊 処理スループット):(?P<val>[^:]*)')
+_SENTINEL_KEYS = {
+    '🎯 成功テスト': 'success_rate',
+    '⚡ 分類精度': 'classification_accuracy',
+    '📊 処理スループット': 'throughput',
+}
+
+# CPU使用率の最小計測区間（秒）
+CPU_SAMPLE_SECONDS = 1.0
+
+# 失敗時の調査用に保持する標準出力の末尾行数
+STDOUT_TAIL_LINES = 200
+
+def _scan_models(models_path, names=REQUIRED_MODELS) -> dict:
+    """モデルディレクトリを1回だけ走査し {ファイル名: サイズ(bytes)} を返す"""
+    try:
+        with os.scandir(models_path) as entries:
+            return {
+                entry.name: entry.stat().st_size
+                for entry in entries
+                if entry.name in names and entry.is_file()
+            }
+    except OSError:
+        # ディレクトリ自体がない場合は全モデル欠落として扱う
+        return {}
+
 class Uma3OperationManager:
     """Uma3 機械学習システム運用管理クラス"""
 
@@ -43,6 +84,14 @@ class Uma3OperationManager:
         self.ml_models_path = self.project_root / 'Lesson25' / 'uma3soft-app' / 'ml_models'
         self.logs_path = self.project_root / 'Lesson25' / 'uma3soft-app' / 'logs'
         self.src_path = self.project_root / 'Lesson25' / 'uma3soft-app' / 'src'
+        self.chroma_store_path = self.project_root / 'Lesson25' / 'uma3soft-app' / 'db' / 'chroma_store'
+
+        # チェック・サブプロセス起動で繰り返し使うパスは文字列で一度だけ作っておく
+        self._project_root_str = str(self.project_root)
+        self._venv_python_str = str(self.venv_python)
+        self._chroma_store_str = str(self.chroma_store_path)
+        self._test_script_str = str(self.src_path / 'ml_integration_test.py')
+        self._train_script_str = str(self.src_path / 'ml_training_system_offline.py')
 
         # 運用メトリクス
         self.metrics = {
@@ -52,6 +101,79 @@ class Uma3OperationManager:
             'maintenance_log': []
         }
 
+        # CPU使用率の計測開始（monitor_performanceまでの処理時間を計測区間に充てる）
+        self._prime_cpu_sample()
+
+        # レポート保存用DB接続（初回保存時に接続）
+        self._report_db = None
+
+    def _prime_cpu_sample(self):
+        """
+        CPU使用率の計測区間を開始する
+
+        自身が起動したサブプロセス（統合テスト・再訓練）の負荷を計測区間に含めないよう、
+        サブプロセス終了後にも呼び出して区間を開始し直す
+        """
+        psutil.cpu_percent(interval=None)
+        self._cpu_primed_at = time.monotonic()
+
+    def _run_streaming(self, cmd: list, timeout: float, on_line) -> tuple:
+        """
+        サブプロセスを起動し、標準出力を1行ずつ on_line に渡す
+
+        出力全体はメモリに溜めず、失敗時の調査用に末尾 STDOUT_TAIL_LINES 行だけ保持する。
+        timeout 秒を超えた場合はプロセスを停止して subprocess.TimeoutExpired を送出する。
+
+        Returns:
+            tuple: (returncode, 標準出力の末尾, 標準エラー出力)
+        """
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            cwd=self._project_root_str
+        )
+
+        # stderrは別スレッドで読み切る（パイプが詰まって子プロセスが止まるのを防ぐ）
+        stderr_chunks = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_chunks.append(process.stderr.read()),
+            daemon=True
+        )
+        stderr_reader.start()
+
+        timed_out = threading.Event()
+
+        def _kill_on_timeout():
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, _kill_on_timeout)
+        timer.start()
+
+        stdout_tail = deque(maxlen=STDOUT_TAIL_LINES)
+        try:
+            for line in process.stdout:
+                stdout_tail.append(line)
+                on_line(line)
+            process.wait()
+        finally:
+            timer.cancel()
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            stderr_reader.join()
+            process.stdout.close()
+            process.stderr.close()
+            # 子プロセスの負荷をCPU使用率の計測区間から除外
+            self._prime_cpu_sample()
+
+        if timed_out.is_set():
+            raise subprocess.TimeoutExpired(cmd, timeout)
+
+        return process.returncode, ''.join(stdout_tail), ''.join(stderr_chunks)
+
     def check_system_health(self) -> dict:
         """システム健全性チェック"""
         print("🏥 システム健全性チェック実行中...")
@@ -64,7 +186,7 @@ class Uma3OperationManager:
 
         try:
             # 1. Python環境チェック
-            if self.venv_python.exists():
+            if os.path.exists(self._venv_python_str):
                 health_status['components']['python_env'] = 'OK'
                 print("  ✅ Python仮想環境: 正常")
             else:
@@ -73,18 +195,12 @@ class Uma3OperationManager:
                 print("  ❌ Python仮想環境: 見つかりません")
 
             # 2. 学習済みモデルチェック
-            required_models = [
-                'classification_model.pkl',
-                'clustering_model.pkl',
-                'vectorizer.pkl',
-                'scaler.pkl'
-            ]
+            model_sizes = _scan_models(self.ml_models_path)
 
             missing_models = []
-            for model in required_models:
-                model_path = self.ml_models_path / model
-                if model_path.exists():
-                    size_mb = model_path.stat().st_size / 1024 / 1024
+            for model in REQUIRED_MODELS:
+                if model in model_sizes:
+                    size_mb = model_sizes[model] / 1024 / 1024
                     print(f"  ✅ {model}: 正常 ({size_mb:.1f}MB)")
                 else:
                     missing_models.append(model)
@@ -98,8 +214,7 @@ class Uma3OperationManager:
 
             # 3. データベース接続チェック
             try:
-                db_path = self.project_root / 'Lesson25' / 'uma3soft-app' / 'db' / 'chroma_store'
-                if db_path.exists():
+                if os.path.exists(self._chroma_store_str):
                     health_status['components']['database'] = 'OK'
                     print("  ✅ ChromaDB: 接続可能")
                 else:
@@ -111,7 +226,7 @@ class Uma3OperationManager:
 
             # 4. ディスク容量チェック
             try:
-                disk_usage = psutil.disk_usage(str(self.project_root))
+                disk_usage = psutil.disk_usage(self._project_root_str)
                 free_gb = disk_usage.free / 1024 / 1024 / 1024
 
                 if free_gb > 5.0:  # 5GB以上の空き容量
@@ -130,17 +245,21 @@ class Uma3OperationManager:
             python_processes = []
             ngrok_processes = []
 
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    if proc.info['name'] and 'python' in proc.info['name'].lower():
-                        if proc.info['cmdline'] and any('uma3' in cmd.lower() for cmd in proc.info['cmdline']):
-                            python_processes.append(proc.info['pid'])
+            # 必要な属性を1回の走査でまとめて取得（取得不可の属性はNone、消えたプロセスはスキップ済み）
+            for proc in psutil.process_iter(attrs=['pid', 'name', 'cmdline'], ad_value=None):
+                info = proc.info
+                name = (info['name'] or '').lower()
+                if not name:
+                    continue
 
-                    if proc.info['name'] and 'ngrok' in proc.info['name'].lower():
-                        ngrok_processes.append(proc.info['pid'])
+                if 'python' in name:
+                    # コマンドラインは連結して1回だけ小文字化
+                    cmdline = ' '.join(info['cmdline'] or ()).lower()
+                    if 'uma3' in cmdline:
+                        python_processes.append(info['pid'])
 
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
+                if 'ngrok' in name:
+                    ngrok_processes.append(info['pid'])
 
             health_status['components']['processes'] = {
                 'python_processes': len(python_processes),
@@ -169,43 +288,41 @@ class Uma3OperationManager:
 
         try:
             # 統合テスト実行
-            test_script = self.src_path / 'ml_integration_test.py'
-
-            if not test_script.exists():
+            if not os.path.exists(self._test_script_str):
                 test_result['error'] = 'Integration test script not found'
                 print("  ❌ 統合テストスクリプトが見つかりません")
                 return test_result
 
-            cmd = [str(self.venv_python), str(test_script)]
-            result = subprocess.run(
+            # 出力から重要な指標を抽出（全指標が揃ったら以降の行は照合しない）
+            details = {}
+
+            def collect_metrics(line):
+                if len(details) == len(_SENTINEL_KEYS):
+                    return
+                match = _SENTINEL_RE.search(line)
+                if match:
+                    details.setdefault(_SENTINEL_KEYS[match['key']], match['val'].strip())
+
+            cmd = [self._venv_python_str, self._test_script_str]
+            returncode, stdout_tail, stderr = self._run_streaming(
                 cmd,
-                capture_output=True,
-                text=True,
                 timeout=300,  # 5分タイムアウト
-                cwd=str(self.project_root)
+                on_line=collect_metrics
             )
 
-            if result.returncode == 0:
+            if returncode == 0:
                 test_result['success'] = True
+                test_result['details'] = details
                 print("  ✅ 統合テスト成功")
 
-                # 出力から重要な指標を抽出
-                output_lines = result.stdout.split('\n')
-                for line in output_lines:
-                    if '🎯 成功テスト:' in line:
-                        test_result['details']['success_rate'] = line.split(':')[1].strip()
-                    elif '⚡ 分類精度:' in line:
-                        test_result['details']['classification_accuracy'] = line.split(':')[1].strip()
-                    elif '📊 処理スループット:' in line:
-                        test_result['details']['throughput'] = line.split(':')[1].strip()
-
             else:
                 test_result['success'] = False
-                test_result['error'] = result.stderr
-                print(f"  ❌ 統合テスト失敗: {result.stderr}")
+                test_result['error'] = stderr
+                # 成功時は出力全体を保持しない（失敗時のみ末尾を残す）
+                test_result['stdout'] = stdout_tail
+                print(f"  ❌ 統合テスト失敗: {stderr}")
 
-            test_result['stdout'] = result.stdout
-            test_result['stderr'] = result.stderr
+            test_result['stderr'] = stderr
 
         except subprocess.TimeoutExpired:
             test_result['error'] = 'Test execution timeout'
@@ -222,11 +339,20 @@ class Uma3OperationManager:
         """パフォーマンス監視"""
         print("📊 パフォーマンス監視実行中...")
 
+        # CPU使用率は初期化時（またはサブプロセス終了時）からの区間で計測（最低 CPU_SAMPLE_SECONDS 秒の区間を確保）
+        remaining = CPU_SAMPLE_SECONDS - (time.monotonic() - self._cpu_primed_at)
+        if remaining > 0:
+            time.sleep(remaining)
+        cpu_usage = psutil.cpu_percent(interval=None)
+        self._cpu_primed_at = time.monotonic()
+
+        disk_io = psutil.disk_io_counters()
+
         performance_data = {
             'timestamp': datetime.now().isoformat(),
-            'cpu_usage': psutil.cpu_percent(interval=1),
+            'cpu_usage': cpu_usage,
             'memory_usage': psutil.virtual_memory().percent,
-            'disk_io': psutil.disk_io_counters()._asdict() if psutil.disk_io_counters() else {},
+            'disk_io': disk_io._asdict() if disk_io else {},
             'network_io': psutil.net_io_counters()._asdict()
         }
 
@@ -261,40 +387,38 @@ class Uma3OperationManager:
 
         try:
             # モデル再訓練スクリプト実行
-            train_script = self.src_path / 'ml_training_system_offline.py'
-
-            if not train_script.exists():
+            if not os.path.exists(self._train_script_str):
                 retrain_result['error'] = 'Training script not found'
                 print("  ❌ 訓練スクリプトが見つかりません")
                 return retrain_result
 
-            cmd = [str(self.venv_python), str(train_script)]
-            result = subprocess.run(
+            # 訓練結果から精度を抽出（最初に見つかった行のみ）
+            details = {}
+
+            def collect_accuracy(line):
+                if 'accuracy' not in details and ('accuracy' in line.lower() or '精度' in line):
+                    details['accuracy'] = line.strip()
+
+            cmd = [self._venv_python_str, self._train_script_str]
+            returncode, stdout_tail, stderr = self._run_streaming(
                 cmd,
-                capture_output=True,
-                text=True,
                 timeout=600,  # 10分タイムアウト
-                cwd=str(self.project_root)
+                on_line=collect_accuracy
             )
 
-            if result.returncode == 0:
+            if returncode == 0:
                 retrain_result['success'] = True
+                retrain_result['details'] = details
                 print("  ✅ モデル再訓練成功")
 
-                # 訓練結果から精度を抽出
-                output_lines = result.stdout.split('\n')
-                for line in output_lines:
-                    if 'accuracy' in line.lower() or '精度' in line:
-                        retrain_result['details']['accuracy'] = line.strip()
-                        break
-
             else:
                 retrain_result['success'] = False
-                retrain_result['error'] = result.stderr
-                print(f"  ❌ モデル再訓練失敗: {result.stderr}")
+                retrain_result['error'] = stderr
+                # 成功時は出力全体を保持しない（失敗時のみ末尾を残す）
+                retrain_result['stdout'] = stdout_tail
+                print(f"  ❌ モデル再訓練失敗: {stderr}")
 
-            retrain_result['stdout'] = result.stdout
-            retrain_result['stderr'] = result.stderr
+            retrain_result['stderr'] = stderr
 
         except subprocess.TimeoutExpired:
             retrain_result['error'] = 'Training timeout'
@@ -319,17 +443,25 @@ class Uma3OperationManager:
         }
 
         try:
-            cutoff_date = datetime.now() - timedelta(days=days_to_keep)
+            # 比較はfloatのまま行う（ファイルごとのdatetime生成を避ける）
+            cutoff_ts = time.time() - days_to_keep * 86400.0
 
-            log_files = list(self.logs_path.glob('*.log*'))
+            # 1回のディレクトリ走査で対象ファイルを列挙（'*.log*' 相当）
+            with os.scandir(self.logs_path) as entries:
+                log_files = [
+                    entry for entry in entries
+                    if '.log' in entry.name and entry.is_file(follow_symlinks=False)
+                ]
 
+            unlink = os.unlink
             for log_file in log_files:
                 try:
-                    file_modified = datetime.fromtimestamp(log_file.stat().st_mtime)
+                    # stat結果は1回だけ取得して更新日時とサイズに使い回す
+                    file_stat = log_file.stat()
 
-                    if file_modified < cutoff_date:
-                        file_size = log_file.stat().st_size
-                        log_file.unlink()
+                    if file_stat.st_mtime < cutoff_ts:
+                        file_size = file_stat.st_size
+                        unlink(log_file.path)
 
                         cleanup_result['files_deleted'] += 1
                         cleanup_result['bytes_freed'] += file_size
@@ -350,8 +482,27 @@ class Uma3OperationManager:
 
         return cleanup_result
 
-    def generate_status_report(self) -> dict:
-        """システム状況レポート生成"""
+    def _get_report_db(self) -> sqlite3.Connection:
+        """レポート保存用SQLiteデータベースに接続（初回のみテーブル作成）"""
+        if self._report_db is None:
+            conn = sqlite3.connect(str(self.logs_path / REPORT_DB_NAME), isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS reports ("
+                "ts TEXT PRIMARY KEY, overall TEXT, health TEXT, test TEXT, "
+                "perf TEXT, recommendations TEXT)"
+            )
+            self._report_db = conn
+        return self._report_db
+
+    def generate_status_report(self, legacy_json: bool = False) -> dict:
+        """
+        システム状況レポート生成
+
+        Args:
+            legacy_json (bool): Trueの場合は従来どおり実行ごとにJSONファイルへ保存
+        """
         print("📋 システム状況レポート生成中...")
 
         # 各種チェック実行
@@ -369,14 +520,33 @@ class Uma3OperationManager:
             'recommendations': self._generate_recommendations(health_status, integration_test, performance_data)
         }
 
-        # レポートファイル保存
-        report_filename = f"system_status_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        report_path = self.logs_path / report_filename
+        if legacy_json:
+            # レポートファイル保存
+            report_filename = f"system_status_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            report_path = self.logs_path / report_filename
 
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+
+            print(f"  💾 レポート保存: {report_path}")
+        else:
+            # 1実行1行でSQLiteへ追記（レポートファイルを増やさない）
+            def to_json(value):
+                return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+            self._get_report_db().execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    report['report_timestamp'],
+                    report['overall_status'],
+                    to_json(health_status),
+                    to_json(integration_test),
+                    to_json(performance_data),
+                    to_json(report['recommendations']),
+                )
+            )
 
-        print(f"  💾 レポート保存: {report_path}")
+            print(f"  💾 レポート保存: {self.logs_path / REPORT_DB_NAME}")
 
         return report
 
@@ -421,6 +591,8 @@ def main():
         'health-check', 'test', 'monitor', 'retrain', 'cleanup', 'report', 'full-maintenance'
     ], default='report', help='実行するアクション')
     parser.add_argument('--cleanup-days', type=int, default=30, help='ログクリーンアップ保持日数')
+    parser.add_argument('--legacy-json', action='store_true',
+                        help='レポートをSQLiteではなく従来のJSONファイルに保存')
 
     args = parser.parse_args()
 
@@ -452,7 +624,7 @@ def main():
             print(f"\n🧹 ログクリーンアップ: {result['files_deleted']}ファイル削除")
 
         elif args.action == 'report':
-            result = manager.generate_status_report()
+            result = manager.generate_status_report(legacy_json=args.legacy_json)
             print(f"\n📋 システム状況: {result['overall_status']}")
             print("推奨事項:")
             for rec in result['recommendations']:
@@ -481,7 +653,7 @@ def main():
             cleanup = manager.cleanup_logs(args.cleanup_days)
 
             # 5. 最終レポート生成
-            report = manager.generate_status_report()
+            report = manager.generate_status_report(legacy_json=args.legacy_json)
 
             print(f"\n🎉 フルメンテナンス完了 - システム状況: {report['overall_status']}")
 
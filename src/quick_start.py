@@ -6,6 +6,7 @@ LINE Bot + ML統合システムを一括で起動・停止するためのユー
 """
 
 import os
+import re
 import sys
 import subprocess
 import time
@@ -20,6 +21,32 @@ import psutil
 PROJECT_ROOT = Path(r"C:\work\ws_python\GenerationAiCamp")
 VENV_PYTHON = PROJECT_ROOT / 'venv' / 'Scripts' / 'python.exe'
 SRC_PATH = PROJECT_ROOT / 'Lesson25' / 'uma3soft-app' / 'src'
+MODELS_PATH = PROJECT_ROOT / 'Lesson25' / 'uma3soft-app' / 'ml_models'
+
+# ngrokローカルAPI（起動待ちはこのAPIをポーリングして確認）
+NGROK_API_URL = 'http://127.0.0.1:4040/api/tunnels'
+NGROK_STARTUP_TIMEOUT = 15.0
+NGROK_POLL_INTERVAL = 0.1
+
+# 統合テスト出力の指標行（3種類を1回の走査で判定）
+_SENTINEL_RE = re.compile(r'🎯 成功テスト:|⚡ 分類精度:|📊 処理スループット:')
+
+# 起動に必要な学習済みモデル
+REQUIRED_MODELS = (
+    'classification_model.pkl',
+    'clustering_model.pkl',
+    'vectorizer.pkl',
+    'scaler.pkl'
+)
+
+def _scan_models(models_path) -> set:
+    """モデルディレクトリを1回だけ走査し、存在するファイル名の集合を返す"""
+    try:
+        with os.scandir(models_path) as entries:
+            return {entry.name for entry in entries if entry.is_file()}
+    except OSError:
+        # ディレクトリ自体がない場合は全モデル欠落として扱う
+        return set()
 
 class Uma3QuickStart:
     """Uma3システム一括管理クラス"""
@@ -27,6 +54,36 @@ class Uma3QuickStart:
     def __init__(self):
         self.processes = {}
         self.ngrok_url = None
+        # ngrok APIへの接続を使い回す
+        self._session = requests.Session()
+
+    def _wait_for_ngrok_url(self, timeout: float = NGROK_STARTUP_TIMEOUT) -> str:
+        """
+        ngrok APIをポーリングし、トンネルの公開URLが取得できるまで待機
+
+        Returns:
+            str: 公開URL（timeout秒以内に取得できなければNone）
+        """
+        deadline = time.monotonic() + timeout
+        last_problem = None
+
+        while True:
+            try:
+                response = self._session.get(NGROK_API_URL, timeout=0.5)
+                if response.status_code == 200:
+                    tunnels = response.json()['tunnels']
+                    if tunnels:
+                        return tunnels[0]['public_url']
+                    last_problem = "ngrokトンネルが見つかりません"
+                else:
+                    last_problem = f"ngrok API応答エラー: {response.status_code}"
+            except requests.RequestException as e:
+                last_problem = f"ngrok URL取得エラー: {e}"
+
+            if time.monotonic() >= deadline:
+                print(f"  ⚠️ {last_problem}")
+                return None
+            time.sleep(NGROK_POLL_INTERVAL)
 
     def check_prerequisites(self) -> bool:
         """前提条件チェック"""
@@ -39,18 +96,8 @@ class Uma3QuickStart:
         print("  ✅ Python仮想環境: OK")
 
         # MLモデル確認
-        models_path = PROJECT_ROOT / 'Lesson25' / 'uma3soft-app' / 'ml_models'
-        required_models = [
-            'classification_model.pkl',
-            'clustering_model.pkl',
-            'vectorizer.pkl',
-            'scaler.pkl'
-        ]
-
-        missing_models = []
-        for model in required_models:
-            if not (models_path / model).exists():
-                missing_models.append(model)
+        available_models = _scan_models(MODELS_PATH)
+        missing_models = [model for model in REQUIRED_MODELS if model not in available_models]
 
         if missing_models:
             print(f"  ⚠️ 不足しているモデル: {missing_models}")
@@ -91,25 +138,13 @@ class Uma3QuickStart:
 
             self.processes['ngrok'] = process
 
-            # ngrokの起動を待機
+            # ngrokの起動を待機（トンネルが確立した時点ですぐにURLを取得）
             print("  ⏳ ngrok起動を待機中...")
-            time.sleep(5)
-
-            # ngrok URLを取得
-            try:
-                response = requests.get('http://localhost:4040/api/tunnels', timeout=10)
-                if response.status_code == 200:
-                    tunnels = response.json()['tunnels']
-                    if tunnels:
-                        self.ngrok_url = tunnels[0]['public_url']
-                        print(f"  ✅ ngrok URL: {self.ngrok_url}")
-                        return self.ngrok_url
-                    else:
-                        print("  ⚠️ ngrokトンネルが見つかりません")
-                else:
-                    print(f"  ⚠️ ngrok API応答エラー: {response.status_code}")
-            except requests.RequestException as e:
-                print(f"  ⚠️ ngrok URL取得エラー: {e}")
+            ngrok_url = self._wait_for_ngrok_url()
+            if ngrok_url:
+                self.ngrok_url = ngrok_url
+                print(f"  ✅ ngrok URL: {self.ngrok_url}")
+                return self.ngrok_url
 
             return "ngrok起動中（URL取得は手動で確認してください）"
 
@@ -176,11 +211,7 @@ class Uma3QuickStart:
                 # テスト結果から重要情報を抽出
                 lines = result.stdout.split('\n')
                 for line in lines:
-                    if '🎯 成功テスト:' in line:
-                        print(f"  📊 {line.strip()}")
-                    elif '⚡ 分類精度:' in line:
-                        print(f"  📊 {line.strip()}")
-                    elif '📊 処理スループット:' in line:
+                    if _SENTINEL_RE.search(line):
                         print(f"  📊 {line.strip()}")
 
                 return True
@@ -196,43 +227,73 @@ class Uma3QuickStart:
             print(f"  ❌ システム動作確認エラー: {e}")
             return False
 
-    def stop_process(self, process_name: str):
-        """指定プロセス停止"""
-        print(f"🛑 {process_name}プロセス停止中...")
+    def _stop_managed_process(self, process_name: str):
+        """管理下のプロセスを子プロセスごと停止"""
+        process = self.processes.pop(process_name)
 
-        # 管理下のプロセス停止
-        if process_name in self.processes:
-            process = self.processes[process_name]
+        # 子プロセス（ngrokのエージェントやFlaskのリローダー等）を先にまとめて停止
+        try:
+            children = psutil.Process(process.pid).children(recursive=True)
+        except psutil.NoSuchProcess:
+            children = []
+        for child in children:
             try:
-                process.terminate()
-                process.wait(timeout=10)
-                print(f"  ✅ {process_name}プロセス停止完了")
-            except subprocess.TimeoutExpired:
-                process.kill()
-                print(f"  🔥 {process_name}プロセス強制終了")
-            except Exception as e:
-                print(f"  ⚠️ {process_name}プロセス停止エラー: {e}")
+                child.terminate()
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+        try:
+            process.terminate()
+            process.wait(timeout=10)
+            print(f"  ✅ {process_name}プロセス停止完了")
+        except subprocess.TimeoutExpired:
+            process.kill()
+            print(f"  🔥 {process_name}プロセス強制終了")
+        except Exception as e:
+            print(f"  ⚠️ {process_name}プロセス停止エラー: {e}")
 
-            del self.processes[process_name]
+    def _stop_processes_by_name(self, process_names: tuple):
+        """システム全体の指定名プロセスを1回の走査でまとめて停止"""
+        own_pid = os.getpid()  # 自分自身（このツールのpython）は停止しない
+        names = [name.lower() for name in process_names]
 
-        # システム全体の同名プロセス停止
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-                try:
-                    if proc.info['name'] and process_name.lower() in proc.info['name'].lower():
-                        proc.terminate()
-                        print(f"  🛑 {process_name} PID {proc.info['pid']} 停止")
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
+            # 名前だけを一括取得（取得不可の属性はNone、消えたプロセスはスキップ済み）
+            for proc in psutil.process_iter(attrs=['pid', 'name'], ad_value=None):
+                proc_name = (proc.info['name'] or '').lower()
+                if not proc_name or proc.info['pid'] == own_pid:
                     continue
+
+                for name in names:
+                    if name in proc_name:
+                        try:
+                            proc.terminate()
+                            print(f"  🛑 {name} PID {proc.info['pid']} 停止")
+                        except (psutil.NoSuchProcess, psutil.AccessDenied):
+                            pass
+                        break
         except Exception as e:
             print(f"  ⚠️ システムプロセス停止エラー: {e}")
 
+    def stop_process(self, process_name: str):
+        """指定プロセス停止"""
+        print(f"🛑 {process_name}プロセス停止中...")
+
+        # 管理下のプロセス停止
+        if process_name in self.processes:
+            self._stop_managed_process(process_name)
+
+        # システム全体の同名プロセス停止
+        self._stop_processes_by_name((process_name,))
+
     def stop_all(self):
         """全プロセス停止"""
         print("🛑 全システム停止中...")
 
-        self.stop_process('python')
-        self.stop_process('ngrok')
+        # 管理下のプロセスを停止してから、残った python / ngrok を1回の走査で停止
+        for process_name in list(self.processes):
+            self._stop_managed_process(process_name)
+        self._stop_processes_by_name(('python', 'ngrok'))
 
         print("  ✅ 全システム停止完了")
 
@@ -244,23 +305,23 @@ class Uma3QuickStart:
         python_procs = []
         ngrok_procs = []
 
-        for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
-            try:
-                if proc.info['name']:
-                    if 'python' in proc.info['name'].lower():
-                        if proc.info['cmdline'] and any('uma3' in str(cmd).lower() for cmd in proc.info['cmdline']):
-                            python_procs.append(f"PID {proc.info['pid']}")
-                    elif 'ngrok' in proc.info['name'].lower():
-                        ngrok_procs.append(f"PID {proc.info['pid']}")
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
+        # 必要な属性を1回の走査でまとめて取得（取得不可の属性はNone、消えたプロセスはスキップ済み）
+        for proc in psutil.process_iter(attrs=['pid', 'name', 'cmdline'], ad_value=None):
+            name = (proc.info['name'] or '').lower()
+            if 'python' in name:
+                # コマンドラインは連結して1回だけ小文字化
+                cmdline = ' '.join(proc.info['cmdline'] or ()).lower()
+                if 'uma3' in cmdline:
+                    python_procs.append(f"PID {proc.info['pid']}")
+            elif 'ngrok' in name:
+                ngrok_procs.append(f"PID {proc.info['pid']}")
 
         print(f"  🐍 Python (uma3): {len(python_procs)}個 {python_procs}")
         print(f"  🌐 ngrok: {len(ngrok_procs)}個 {ngrok_procs}")
 
         # ngrok URL確認
         try:
-            response = requests.get('http://localhost:4040/api/tunnels', timeout=5)
+            response = self._session.get(NGROK_API_URL, timeout=5)
             if response.status_code == 200:
                 tunnels = response.json()['tunnels']
                 if tunnels:
@@ -15,16 +15,27 @@ import os
 import sys
 import pickle
 import numpy as np
-import pandas as pd
 from typing import List, Dict, Tuple, Optional
 import json
 from datetime import datetime, timedelta
 import sqlite3
 import re
+import hashlib
 from collections import Counter, defaultdict
+from functools import lru_cache
+
+try:
+    # orjsonがあればレポート保存を高速化（出力はUTF-8そのまま）
+    import orjson
+
+    def _dump_report(results: Dict) -> bytes:
+        return orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    def _dump_report(results: Dict) -> bytes:
+        return json.dumps(results, ensure_ascii=False, indent=2).encode('utf-8')
 
 # 機械学習関連
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 
 # プロジェクトルートの絶対パス取得
@@ -33,6 +44,38 @@ MODELS_PATH = os.path.join(PROJECT_ROOT, 'ml_models')
 DB_PATH = os.path.join(PROJECT_ROOT, 'db')
 CHROMA_DB_PATH = os.path.join(DB_PATH, 'chroma_store')
 CONVERSATION_DB_PATH = os.path.join(DB_PATH, 'conversation_history.db')
+CONTENT_INDEX_CACHE = os.path.join(MODELS_PATH, 'content_index.pkl')
+CONTENT_MATRIX_CACHE = os.path.join(MODELS_PATH, 'content_matrix.npz')
+
+@lru_cache(maxsize=16384)
+def _parse_iso(timestamp_str: str) -> datetime:
+    """ISO形式のタイムスタンプを解析（同一文字列は再解析しない）"""
+    return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+
+def _preview(content: str, limit: int = 200) -> str:
+    """検索結果表示用の抜粋（短い本文はそのまま返す）"""
+    return content if len(content) <= limit else content[:limit] + '...'
+
+# 手動特徴量で使用する選手名
+PLAYER_NAMES = ('翔平', '聡太', '勘太', '暖大', '英汰', '悠琉')
+_NAME_RE = re.compile('|'.join(PLAYER_NAMES))
+_DIGIT_RE = re.compile(r'\d')
+
+def _manual_features_matrix(texts: List[str]) -> np.ndarray:
+    """手動特徴量（N x 10）を列単位で一括算出"""
+    n = len(texts)
+    out = np.empty((n, 10), dtype=np.int32)
+    out[:, 0] = np.fromiter((len(t) for t in texts), np.int32, count=n)                                # 文書長
+    out[:, 1] = np.fromiter((len(t.split()) for t in texts), np.int32, count=n)                        # 単語数
+    out[:, 2] = np.fromiter(('？' in t or 'Q:' in t for t in texts), np.int32, count=n)               # 質問文
+    out[:, 3] = np.fromiter(('A:' in t or '回答' in t for t in texts), np.int32, count=n)             # 回答文
+    out[:, 4] = np.fromiter((_NAME_RE.search(t) is not None for t in texts), np.int32, count=n)        # 選手名
+    out[:, 5] = np.fromiter((len(_DIGIT_RE.findall(t)) for t in texts), np.int32, count=n)             # 数字の個数
+    out[:, 6] = np.fromiter((t.count('、') for t in texts), np.int32, count=n)                        # 読点
+    out[:, 7] = np.fromiter((t.count('。') for t in texts), np.int32, count=n)                        # 句点
+    out[:, 8] = np.fromiter(('チーム' in t or 'ソフト' in t for t in texts), np.int32, count=n)       # チーム関連
+    out[:, 9] = np.fromiter(('練習' in t or '試合' in t for t in texts), np.int32, count=n)           # 活動関連
+    return out
 
 class Uma3RealTimeMLAnalyzer:
     """Uma3 リアルタイム機械学習分析システム"""
@@ -52,6 +95,12 @@ class Uma3RealTimeMLAnalyzer:
         self.user_behavior_patterns = {}
         self.content_database = []
 
+        # 類似検索インデックス（content_database 更新時に再構築）
+        self._content_vectorizer = None
+        self._content_matrix = None
+        self._content_lower = []
+        self._index_dirty = True
+
         # 分析結果格納用
         self.analysis_cache = {}
         self.similarity_matrix = None
@@ -78,6 +127,9 @@ class Uma3RealTimeMLAnalyzer:
         # 履歴データ読み込み
         self.load_historical_data()
 
+        # 類似検索インデックス構築
+        self._build_content_index()
+
         # 類似度マトリックス構築
         self.build_similarity_matrix()
 
@@ -147,19 +199,40 @@ class Uma3RealTimeMLAnalyzer:
 
                 # フルテキストサーチデータ取得
                 cursor.execute("SELECT string_value FROM embedding_fulltext_search WHERE string_value IS NOT NULL LIMIT 200")
-                rows = cursor.fetchall()
-
-                for row in rows:
-                    if row[0] and len(str(row[0]).strip()) > 10:
-                        self.content_database.append({
-                            'content': str(row[0]),
+                loaded_at = datetime.now().isoformat()
+                # 重複コンテンツは最初の1件のみ保持し、件数を記録
+                seen = {}
+
+                while True:
+                    rows = cursor.fetchmany(64)
+                    if not rows:
+                        break
+
+                    for row in rows:
+                        if not row[0]:
+                            continue
+                        content = row[0] if isinstance(row[0], str) else str(row[0])
+                        if len(content.strip()) <= 10:
+                            continue
+
+                        key = hashlib.blake2b(content.encode('utf-8', 'ignore'), digest_size=8).digest()
+                        if key in seen:
+                            seen[key]['duplicate_count'] += 1
+                            continue
+
+                        item = {
+                            'content': content,
                             'source': 'chroma_db',
-                            'timestamp': datetime.now().isoformat(),
-                            'content_length': len(str(row[0])),
-                            'word_count': len(str(row[0]).split())
-                        })
+                            'timestamp': loaded_at,
+                            'content_length': len(content),
+                            'word_count': len(content.split()),
+                            'duplicate_count': 1
+                        }
+                        seen[key] = item
+                        self.content_database.append(item)
 
                 conn.close()
+                self._index_dirty = True
                 print(f"✅ ChromaDBから {len(self.content_database)} 件のコンテンツを読み込み")
 
             # 会話履歴データ取得
@@ -190,79 +263,146 @@ class Uma3RealTimeMLAnalyzer:
         except Exception as e:
             print(f"❌ 履歴データ読み込みエラー: {e}")
 
+    def _build_content_index(self):
+        """類似検索用のTF-IDFインデックスを構築（fitは1回のみ）"""
+        content_texts = [item['content'] for item in self.content_database]
+        # キーワード検索用の小文字化済みテキスト
+        self._content_lower = [text.lower() for text in content_texts]
+
+        if not content_texts:
+            self._content_vectorizer = None
+            self._content_matrix = None
+            self._index_dirty = False
+            return
+
+        # コンテンツが前回と同一ならディスクキャッシュを利用
+        digest = hashlib.blake2b('\0'.join(content_texts).encode('utf-8', 'ignore'), digest_size=16).hexdigest()
+        if not self._load_content_index_cache(digest):
+            vectorizer = TfidfVectorizer(max_features=300, ngram_range=(1, 2), min_df=1, dtype=np.float32).fit(content_texts)
+            self._content_vectorizer = vectorizer
+            self._content_matrix = vectorizer.transform(content_texts)
+            self._save_content_index_cache(digest)
+
+        self._index_dirty = False
+
+    def _load_content_index_cache(self, digest: str) -> bool:
+        """保存済みの類似検索インデックスを読み込み"""
+        try:
+            if not (os.path.exists(CONTENT_INDEX_CACHE) and os.path.exists(CONTENT_MATRIX_CACHE)):
+                return False
+
+            with open(CONTENT_INDEX_CACHE, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('digest') != digest:
+                return False
+
+            self._content_vectorizer = cached['vectorizer']
+            self._content_matrix = sparse.load_npz(CONTENT_MATRIX_CACHE).tocsr().astype(np.float32, copy=False)
+            print("✅ 類似検索インデックスをキャッシュから読み込み")
+            return True
+
+        except Exception as e:
+            print(f"⚠️ 類似検索インデックスキャッシュ読み込みエラー: {e}")
+            return False
+
+    def _save_content_index_cache(self, digest: str):
+        """類似検索インデックスをディスクに保存"""
+        try:
+            os.makedirs(MODELS_PATH, exist_ok=True)
+            # 行列とダイジェストの不整合を避けるため、先に旧インデックスを削除
+            if os.path.exists(CONTENT_INDEX_CACHE):
+                os.remove(CONTENT_INDEX_CACHE)
+            sparse.save_npz(CONTENT_MATRIX_CACHE, self._content_matrix)
+            with open(CONTENT_INDEX_CACHE, 'wb') as f:
+                pickle.dump({'digest': digest, 'vectorizer': self._content_vectorizer}, f)
+
+        except Exception as e:
+            print(f"⚠️ 類似検索インデックスキャッシュ保存エラー: {e}")
+
     def extract_features(self, text: str) -> np.ndarray:
         """テキストから特徴量を抽出"""
+        features = self.extract_features_batch([text])
+        return features.toarray()[0] if sparse.issparse(features) else features[0]
+
+    def extract_features_batch(self, texts: List[str]):
+        """複数テキストから特徴量をまとめて抽出（N x 310）
+
+        スケーラーがない場合はCSR疎行列のまま返す（分類器は疎行列入力に対応）
+        """
         try:
-            # TF-IDF特徴量
+            n = len(texts)
+
+            # TF-IDF特徴量（疎行列のまま保持）
             if self.vectorizer and hasattr(self.vectorizer, 'transform'):
-                tfidf_features = self.vectorizer.transform([text]).toarray()[0]
+                tfidf_features = self.vectorizer.transform(texts)
             else:
-                tfidf_features = np.zeros(300)
+                tfidf_features = sparse.csr_matrix((n, 300))
 
             # 手動特徴量
-            manual_features = [
-                len(text),                                          # 文書長
-                len(text.split()),                                 # 単語数
-                int('？' in text or 'Q:' in text),                 # 質問文
-                int('A:' in text or '回答' in text),               # 回答文
-                int(any(name in text for name in ['翔平', '聡太', '勘太', '暖大', '英汰', '悠琉'])), # 選手名
-                len([x for x in text if x.isdigit()]),            # 数字の個数
-                text.count('、'),                                  # 読点
-                text.count('。'),                                  # 句点
-                int('チーム' in text or 'ソフト' in text),         # チーム関連
-                int('練習' in text or '試合' in text),             # 活動関連
-            ]
+            manual_features = sparse.csr_matrix(_manual_features_matrix(texts))
 
             # 特徴量結合
-            features = np.hstack([tfidf_features, manual_features])
+            features = sparse.hstack([tfidf_features, manual_features], format='csr')
 
             # パディングまたはトリミング（310次元に調整）
-            if len(features) < 310:
-                features = np.pad(features, (0, 310 - len(features)), 'constant')
-            elif len(features) > 310:
-                features = features[:310]
+            if features.shape[1] < 310:
+                features = sparse.hstack([features, sparse.csr_matrix((n, 310 - features.shape[1]))], format='csr')
+            elif features.shape[1] > 310:
+                features = features[:, :310]
 
-            # スケーリング
+            # スケーリング（StandardScalerは密行列が必要）
             if self.scaler:
-                features = self.scaler.transform([features])[0]
+                features = self.scaler.transform(features.toarray())
 
             return features
 
         except Exception as e:
             print(f"❌ 特徴量抽出エラー: {e}")
-            return np.zeros(310)
+            return np.zeros((len(texts), 310))
+
+    def _build_classification_result(self, text: str, prediction, probabilities) -> Dict:
+        """分類結果の辞書を構築"""
+        return {
+            'input_text': text,
+            'predicted_category': self.label_names.get(prediction, 'Unknown'),
+            'predicted_label': int(prediction),
+            'confidence': float(max(probabilities)),
+            'all_probabilities': {
+                self.label_names.get(i, f'Label_{i}'): float(prob)
+                for i, prob in enumerate(probabilities)
+            },
+            'processing_time': datetime.now().isoformat(),
+            'analysis_type': 'realtime_classification'
+        }
 
     def classify_text_realtime(self, text: str) -> Dict:
         """リアルタイムテキスト分類"""
+        return self.classify_texts_batch([text])[0]
+
+    def classify_texts_batch(self, texts: List[str]) -> List[Dict]:
+        """複数テキストを一括分類（predict/predict_probaを1回ずつ実行）"""
         try:
             if not self.classifier:
-                return {'error': '分類モデルが利用できません'}
+                return [{'error': '分類モデルが利用できません'} for _ in texts]
+
+            if not texts:
+                return []
 
             # 特徴量抽出
-            features = self.extract_features(text).reshape(1, -1)
+            features = self.extract_features_batch(texts)
 
             # 予測実行
-            prediction = self.classifier.predict(features)[0]
-            probabilities = self.classifier.predict_proba(features)[0]
+            predictions = self.classifier.predict(features)
+            probabilities = self.classifier.predict_proba(features)
 
             # 結果構築
-            result = {
-                'input_text': text,
-                'predicted_category': self.label_names.get(prediction, 'Unknown'),
-                'predicted_label': int(prediction),
-                'confidence': float(max(probabilities)),
-                'all_probabilities': {
-                    self.label_names.get(i, f'Label_{i}'): float(prob)
-                    for i, prob in enumerate(probabilities)
-                },
-                'processing_time': datetime.now().isoformat(),
-                'analysis_type': 'realtime_classification'
-            }
-
-            return result
+            return [
+                self._build_classification_result(text, prediction, probs)
+                for text, prediction, probs in zip(texts, predictions, probabilities)
+            ]
 
         except Exception as e:
-            return {'error': f'分類エラー: {e}'}
+            return [{'error': f'分類エラー: {e}'} for _ in texts]
 
     def find_similar_content(self, query_text: str, top_k: int = 5) -> List[Dict]:
         """類似コンテンツ発見エンジン"""
@@ -276,35 +416,38 @@ class Uma3RealTimeMLAnalyzer:
             if not self.vectorizer:
                 return [{'error': 'ベクトライザーが利用できません'}]
 
-            # コンテンツデータベースのテキスト準備
-            content_texts = [item['content'] for item in self.content_database]
-
-            # 新しいベクトライザーでの処理
+            # キャッシュ済みインデックスでの処理
             try:
-                # 既存コンテンツでベクトライザーを再フィット
-                temp_vectorizer = TfidfVectorizer(max_features=300, ngram_range=(1, 2), min_df=1)
-                content_vectors = temp_vectorizer.fit_transform(content_texts)
-                query_vector = temp_vectorizer.transform([query_text])
+                # コンテンツ更新時のみインデックスを再構築
+                if self._index_dirty or self._content_vectorizer is None:
+                    self._build_content_index()
+
+                query_vector = self._content_vectorizer.transform([query_text])
 
-                # コサイン類似度計算
-                similarities = cosine_similarity(query_vector, content_vectors)[0]
+                # コサイン類似度計算（TF-IDF行はL2正規化済みのため内積で算出）
+                similarities = (query_vector @ self._content_matrix.T).toarray()[0]
 
-                # 類似度順にソート
-                similar_indices = np.argsort(similarities)[::-1][:top_k]
+                # 最小閾値を超える候補のみから上位k件を部分選択してソート
+                candidates = np.flatnonzero(similarities > 0.01)
+                k = min(top_k, candidates.size)
+                if k > 0:
+                    part = candidates[np.argpartition(-similarities[candidates], k - 1)[:k]]
+                    similar_indices = part[np.argsort(-similarities[part])]
+                else:
+                    similar_indices = candidates[:0]
 
                 results = []
                 for i, idx in enumerate(similar_indices):
-                    if similarities[idx] > 0.01:  # 最小閾値
-                        result = {
-                            'rank': i + 1,
-                            'similarity_score': float(similarities[idx]),
-                            'content': self.content_database[idx]['content'][:200] + '...',
-                            'full_content': self.content_database[idx]['content'],
-                            'source': self.content_database[idx]['source'],
-                            'content_length': self.content_database[idx]['content_length'],
-                            'word_count': self.content_database[idx]['word_count']
-                        }
-                        results.append(result)
+                    content_item = self.content_database[idx]
+                    results.append({
+                        'rank': i + 1,
+                        'similarity_score': float(similarities[idx]),
+                        'content': _preview(content_item['content']),
+                        'full_content': content_item['content'],
+                        'source': content_item['source'],
+                        'content_length': content_item['content_length'],
+                        'word_count': content_item['word_count']
+                    })
 
                 print(f"✅ {len(results)} 件の類似コンテンツを発見")
                 return results
@@ -321,16 +464,15 @@ class Uma3RealTimeMLAnalyzer:
     def _fallback_keyword_search(self, query_text: str, top_k: int) -> List[Dict]:
         """フォールバック: キーワード検索"""
         try:
-            keywords = query_text.split()
+            keywords = [keyword.lower() for keyword in query_text.split()]
             scored_content = []
 
-            for content_item in self.content_database:
-                score = 0
-                content = content_item['content'].lower()
+            content_lower = self._content_lower
+            if len(content_lower) != len(self.content_database):
+                content_lower = [item['content'].lower() for item in self.content_database]
 
-                for keyword in keywords:
-                    if keyword.lower() in content:
-                        score += content.count(keyword.lower())
+            for content, content_item in zip(content_lower, self.content_database):
+                score = sum(content.count(keyword) for keyword in keywords)
 
                 if score > 0:
                     scored_content.append((score, content_item))
@@ -343,7 +485,7 @@ class Uma3RealTimeMLAnalyzer:
                 result = {
                     'rank': i + 1,
                     'similarity_score': float(score / 10),  # 正規化
-                    'content': content_item['content'][:200] + '...',
+                    'content': _preview(content_item['content']),
                     'full_content': content_item['content'],
                     'source': content_item['source'],
                     'search_method': 'keyword_fallback'
@@ -355,36 +497,47 @@ class Uma3RealTimeMLAnalyzer:
         except Exception as e:
             return [{'error': f'フォールバック検索エラー: {e}'}]
 
-    def predict_user_behavior(self, user_id: str, current_context: str = None):
+    def predict_user_behavior(self, user_id: str, current_context: str = None, context_analysis: Dict = None):
         """ユーザー行動予測システム"""
         try:
             print(f"🎯 ユーザー行動予測: {user_id}")
 
-            # ユーザーの履歴データ取得
-            user_history = [item for item in self.historical_data if item.get('user_id') == user_id]
+            # ユーザーの行動パターン取得（分析時に集計済み）
+            pattern = self.user_behavior_patterns.get(user_id)
+            if pattern is None:
+                user_history = [item for item in self.historical_data if item.get('user_id') == user_id]
+
+                if not user_history:
+                    return {
+                        'prediction': 'new_user',
+                        'confidence': 0.5,
+                        'recommendations': ['基本情報の確認', 'チーム紹介', '選手情報'],
+                        'analysis': '新規ユーザーです'
+                    }
 
-            if not user_history:
-                return {
-                    'prediction': 'new_user',
-                    'confidence': 0.5,
-                    'recommendations': ['基本情報の確認', 'チーム紹介', '選手情報'],
-                    'analysis': '新規ユーザーです'
+                message_types = Counter(item['message_type'] for item in user_history)
+                pattern = {
+                    'total_messages': len(user_history),
+                    'message_types': message_types,
+                    'preferred_message_type': message_types.most_common(1)[0][0],
+                    **self._summarize_user_history(user_history)
                 }
 
-            # ユーザーの行動パターン分析
-            user_messages = [item['content'] for item in user_history if item.get('content')]
-            message_types = [item['message_type'] for item in user_history]
+            total_messages = pattern['total_messages']
+            message_lengths = pattern['message_lengths']
 
             # パターン分析
-            avg_message_length = np.mean([len(msg) for msg in user_messages]) if user_messages else 0
-            question_ratio = sum(1 for msg in user_messages if '？' in msg or '?' in msg) / len(user_messages) if user_messages else 0
-            recent_activity = len([item for item in user_history if self._is_recent(item.get('timestamp', ''))])
-
-            # 現在のコンテキスト分類
-            if current_context:
-                context_analysis = self.classify_text_realtime(current_context)
-            else:
-                context_analysis = {'predicted_category': 'その他', 'confidence': 0.5}
+            avg_message_length = message_lengths.mean() if message_lengths.size else 0
+            question_ratio = pattern['question_flags'].mean() if message_lengths.size else 0
+            now = datetime.now()
+            recent_activity = sum(1 for timestamp in pattern['timestamps'] if (now - timestamp).days <= 7)
+
+            # 現在のコンテキスト分類（分類済みの結果があれば再利用）
+            if context_analysis is None:
+                if current_context:
+                    context_analysis = self.classify_text_realtime(current_context)
+                else:
+                    context_analysis = {'predicted_category': 'その他', 'confidence': 0.5}
 
             # 予測ロジック
             if question_ratio > 0.6:
@@ -403,14 +556,14 @@ class Uma3RealTimeMLAnalyzer:
             result = {
                 'user_id': user_id,
                 'prediction': prediction,
-                'confidence': min(0.9, 0.5 + (len(user_history) * 0.05)),
+                'confidence': min(0.9, 0.5 + (total_messages * 0.05)),
                 'recommendations': recommendations,
                 'user_profile': {
-                    'total_messages': len(user_history),
+                    'total_messages': total_messages,
                     'avg_message_length': avg_message_length,
                     'question_ratio': question_ratio,
                     'recent_activity': recent_activity,
-                    'preferred_message_type': max(set(message_types), key=message_types.count) if message_types else 'unknown'
+                    'preferred_message_type': pattern['preferred_message_type']
                 },
                 'context_analysis': context_analysis,
                 'analysis_timestamp': datetime.now().isoformat()
@@ -421,15 +574,33 @@ class Uma3RealTimeMLAnalyzer:
         except Exception as e:
             return {'error': f'ユーザー行動予測エラー: {e}'}
 
-    def _is_recent(self, timestamp_str: str, days: int = 7) -> bool:
-        """最近のアクティビティかチェック"""
+    def _parse_timestamp(self, timestamp_str: str) -> Optional[datetime]:
+        """タイムスタンプ文字列を解析（解析不能・タイムゾーン付きはNone）"""
         try:
             if not timestamp_str:
-                return False
-            timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            return (datetime.now() - timestamp).days <= days
+                return None
+            timestamp = _parse_iso(timestamp_str)
+            # タイムゾーン付きはローカル時刻と比較できないため対象外
+            return timestamp if timestamp.tzinfo is None else None
         except:
+            return None
+
+    def _is_recent(self, timestamp_str: str, days: int = 7, now: Optional[datetime] = None) -> bool:
+        """最近のアクティビティかチェック"""
+        timestamp = self._parse_timestamp(timestamp_str)
+        if timestamp is None:
             return False
+        return ((now or datetime.now()) - timestamp).days <= days
+
+    def _summarize_user_history(self, user_data: List[Dict]) -> Dict:
+        """行動予測用の集計値（メッセージ長・質問フラグ・解析済み時刻）を算出"""
+        messages = [item['content'] for item in user_data if item.get('content')]
+        timestamps = (self._parse_timestamp(item.get('timestamp', '')) for item in user_data)
+        return {
+            'message_lengths': np.fromiter((len(msg) for msg in messages), dtype=np.int32, count=len(messages)),
+            'question_flags': np.fromiter(('？' in msg or '?' in msg for msg in messages), dtype=np.bool_, count=len(messages)),
+            'timestamps': [timestamp for timestamp in timestamps if timestamp is not None]
+        }
 
     def build_similarity_matrix(self):
         """類似度マトリックス構築"""
@@ -442,16 +613,14 @@ class Uma3RealTimeMLAnalyzer:
 
             # サンプルサイズ制限（処理速度のため）
             sample_size = min(50, len(self.content_database))
-            sample_content = self.content_database[:sample_size]
 
-            content_texts = [item['content'] for item in sample_content]
-
-            # TF-IDFベクトル化
-            vectorizer = TfidfVectorizer(max_features=200, ngram_range=(1, 2), min_df=1)
-            tfidf_matrix = vectorizer.fit_transform(content_texts)
+            # 類似検索インデックスのTF-IDF行を再利用（L2正規化済み）
+            if self._index_dirty or self._content_matrix is None:
+                self._build_content_index()
+            tfidf_matrix = self._content_matrix[:sample_size]
 
             # コサイン類似度マトリックス計算
-            self.similarity_matrix = cosine_similarity(tfidf_matrix)
+            self.similarity_matrix = (tfidf_matrix @ tfidf_matrix.T).toarray()
 
             print(f"✅ {sample_size}x{sample_size} 類似度マトリックス構築完了")
 
@@ -475,12 +644,15 @@ class Uma3RealTimeMLAnalyzer:
 
             # パターン分析
             for user_id, user_data in user_groups.items():
+                message_types = Counter(item.get('message_type') for item in user_data)
                 pattern = {
                     'total_messages': len(user_data),
                     'avg_message_length': np.mean([len(str(item.get('content', ''))) for item in user_data]),
-                    'message_types': Counter([item.get('message_type') for item in user_data]),
+                    'message_types': message_types,
+                    'preferred_message_type': message_types.most_common(1)[0][0],
                     'activity_timeframe': self._calculate_activity_timeframe(user_data),
-                    'common_topics': self._extract_common_topics(user_data)
+                    'common_topics': self._extract_common_topics(user_data),
+                    **self._summarize_user_history(user_data)
                 }
                 self.user_behavior_patterns[user_id] = pattern
 
@@ -540,13 +712,13 @@ class Uma3RealTimeMLAnalyzer:
                 'summary_statistics': {}
             }
 
+            # 1. リアルタイム分類（一括実行）
+            results['classifications'] = self.classify_texts_batch(input_texts)
+
             # 各テキストを分析
             for i, text in enumerate(input_texts):
                 print(f"  分析中: {i+1}/{len(input_texts)}")
-
-                # 1. リアルタイム分類
-                classification = self.classify_text_realtime(text)
-                results['classifications'].append(classification)
+                classification = results['classifications'][i]
 
                 # 2. 類似コンテンツ発見
                 similar_content = self.find_similar_content(text, top_k=3)
@@ -557,7 +729,7 @@ class Uma3RealTimeMLAnalyzer:
 
                 # 3. ユーザー行動予測（サンプルユーザーで）
                 sample_user_id = f"user_{i%3 + 1}"  # サンプルユーザー
-                behavior_prediction = self.predict_user_behavior(sample_user_id, text)
+                behavior_prediction = self.predict_user_behavior(sample_user_id, text, classification)
                 results['behavior_predictions'].append(behavior_prediction)
 
             # 4. 統計サマリー
@@ -644,8 +816,8 @@ def run_realtime_analysis_demo():
 
         # レポート保存
         report_file = os.path.join(MODELS_PATH, f'realtime_analysis_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(analysis_results, f, ensure_ascii=False, indent=2)
+        with open(report_file, 'wb') as f:
+            f.write(_dump_report(analysis_results))
 
         print(f"\n💾 詳細レポート保存: {report_file}")
 
@@ -8,10 +8,381 @@
 import os
 import re
 import json
+import logging
+from functools import lru_cache
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable, Tuple
 from typing import Dict, Optional
 
+logger = logging.getLogger(__name__)
+
+# 場所抽出パターン（上から優先）: (必須文字列, パターン)
+# 必須文字列を含まない本文では正規表現を実行しない
+_LOCATION_PATTERNS = tuple((literals, re.compile(pattern, re.MULTILINE)) for literals, pattern in [
+    # 明示的な場所表記（最優先）
+    (('場所',), r'場所[：:]\s*([^\n、。，]+)'),
+    (('会場',), r'会場[：:]\s*([^\n、。，]+)'),
+    (('開催地',), r'開催地[：:]\s*([^\n、。，]+)'),
+    (('集合場所',), r'集合場所[：:]\s*([^\n、。，]+)'),
+    (('【大会会場】',), r'【大会会場】\s*([^\n、。，]+)'),
+
+    # 具体的な施設名パターン（区市町村＋施設名）
+    (('区', '球場'), r'([^都道府県\n]*区[^\n]*球場)'),
+    (('市', '球場'), r'([^都道府県\n]*市[^\n]*球場)'),
+    (('町', '球場'), r'([^都道府県\n]*町[^\n]*球場)'),
+    (('区', 'グラウンド'), r'([^都道府県\n]*区[^\n]*グラウンド)'),
+    (('市', 'グラウンド'), r'([^都道府県\n]*市[^\n]*グラウンド)'),
+    (('町', 'グラウンド'), r'([^都道府県\n]*町[^\n]*グラウンド)'),
+
+    # ドーム・スタジアムなどの施設（「にて」「で」などの助詞を除く）
+    (('ドーム',), r'([^都道府県\n、。]*ドーム)(?:にて|で|において)?'),
+    (('スタジアム',), r'([^都道府県\n、。]*スタジアム)(?:にて|で|において)?'),
+    (('野球場',), r'([^都道府県\n、。]*野球場)(?:にて|で|において)?'),
+    (('運動場',), r'([^都道府県\n、。]*運動場)(?:にて|で|において)?'),
+    (('公園',), r'([^都道府県\n、。]*公園)(?:野球場|にて|で|において)?'),
+
+    # 都道府県付きの場合は具体的な地域を抽出
+    (('東京都', '区', '球場'), r'東京都([^東京都\n]*区[^\n]*球場)'),
+    (('東京都', '市', '球場'), r'東京都([^東京都\n]*市[^\n]*球場)'),
+    (('神奈川県', '区', '球場'), r'神奈川県([^神奈川県\n]*区[^\n]*球場)'),
+    (('神奈川県', '市', '球場'), r'神奈川県([^神奈川県\n]*市[^\n]*球場)'),
+    (('千葉県', '区', '球場'), r'千葉県([^千葉県\n]*区[^\n]*球場)'),
+    (('千葉県', '市', '球場'), r'千葉県([^千葉県\n]*市[^\n]*球場)'),
+    (('埼玉県', '区', '球場'), r'埼玉県([^埼玉県\n]*区[^\n]*球場)'),
+    (('埼玉県', '市', '球場'), r'埼玉県([^埼玉県\n]*市[^\n]*球場)')
+])
+
+# 場所名クリーンアップ用パターン
+_PREFECTURE_PREFIX_RE = re.compile(r'^(東京都|神奈川県|千葉県|埼玉県|大阪府|愛知県|福岡県|北海道)\s*')
+_LOCATION_SPLIT_RE = re.compile(r'[、。，,]')
+_BRACKET_TAIL_RE = re.compile(r'[（）()【】\[\]].*$')
+# 末尾の「〇〇開催」「〇〇実施」と助詞「にて/において/で」を1回で除去
+_TAIL_CLEANUP_RE = re.compile(r'(?:にて開催|で開催|開催|実施)?(?:において|にて|で)?$')
+_PARK_TAIL_RE = re.compile(r'公園$')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 調整さん関連の除外キーワード（部分一致）
+_LINK_KEYWORDS = ("調整さん", "chouseisan", "URL", "https://", "http://")
+_LINK_EXCLUDE_RE = re.compile('|'.join(map(re.escape, _LINK_KEYWORDS)))
+_AUTHOR_EXCLUDE_RE = re.compile('|'.join(map(re.escape, _LINK_KEYWORDS + ("Tel", "電話", "番号", "メール", "@"))))
+
+# 表示用イベント内容から除外する行（キーワードは大文字小文字を区別、パターンは区別しない）
+_DISPLAY_EXCLUDE_RE = re.compile(
+    '|'.join(map(re.escape, _LINK_KEYWORDS + ("↑必ず", "必ずご入力")))
+    + r'|(?i:調整さん.*入力|URL.*入力|↑.*ください|chouseisan\.com)'
+)
+
+# 氏名らしさの判定に使う名前（文字クラスではなく文字列として照合）
+_GIVEN_NAMES = ("太郎", "次郎", "三郎", "四郎", "花子", "美子", "恵子", "春子", "夏子", "秋子", "冬子")
+_FAMILY_NAMES = ("山田", "田中", "佐藤", "鈴木", "高橋", "小林", "松本", "中村", "石川", "前田", "青木", "藤田", "井上")
+_KATAKANA_NAMES = ("タナカ", "ヤマダ", "サトウ", "スズキ", "タカハシ")
+_GIVEN_NAME_ALT = f"(?:{'|'.join(_GIVEN_NAMES)})"
+_FAMILY_NAME_ALT = f"(?:{'|'.join(_FAMILY_NAMES)})"
+_KATAKANA_NAME_ALT = f"(?:{'|'.join(_KATAKANA_NAMES)})"
+
+# 投稿者抽出パターン（上から優先）: (必須文字列, パターン)
+_AUTHOR_PATTERNS = tuple((literals, re.compile(pattern, re.MULTILINE)) for literals, pattern in [
+    # 基本パターン（姓名形式）
+    (('連絡先',), rf'連絡先[：:]\s*([^\s\n（）【】、。]*{_GIVEN_NAME_ALT}[^\s\n]*)'),
+    (('担当',), rf'担当[：:]\s*([^\s\n（）【】、。]*{_GIVEN_NAME_ALT}[^\s\n]*)'),
+    (('投稿者',), rf'投稿者[：:]\s*([^\s\n（）【】、。]*{_GIVEN_NAME_ALT}[^\s\n]*)'),
+    (('主催',), rf'主催[：:]\s*([^\s\n（）【】、。]*{_GIVEN_NAME_ALT}[^\s\n]*)'),
+    (('問い合わせ',), rf'問い合わせ[：:]\s*([^\s\n（）【】、。]*{_GIVEN_NAME_ALT}[^\s\n]*)'),
+
+    # 一般的な氏名パターン（姓+名の形式）
+    (('連絡先',), rf'連絡先[：:]\s*([^\s\n（）【】、。]*{_FAMILY_NAME_ALT}[^\s\n]*)'),
+    (('担当',), rf'担当[：:]\s*([^\s\n（）【】、。]*{_FAMILY_NAME_ALT}[^\s\n]*)'),
+    (('投稿者',), rf'投稿者[：:]\s*([^\s\n（）【】、。]*{_FAMILY_NAME_ALT}[^\s\n]*)'),
+    (('主催',), rf'主催[：:]\s*([^\s\n（）【】、。]*{_FAMILY_NAME_ALT}[^\s\n]*)'),
+    (('問い合わせ',), rf'問い合わせ[：:]\s*([^\s\n（）【】、。]*{_FAMILY_NAME_ALT}[^\s\n]*)'),
+
+    # より寛容なパターン（カタカナ氏名も含む）
+    (('連絡先',), rf'連絡先[：:]\s*([^\s\n（）【】、。]*{_KATAKANA_NAME_ALT}[^\s\n]*)'),
+    (('担当',), rf'担当[：:]\s*([^\s\n（）【】、。]*{_KATAKANA_NAME_ALT}[^\s\n]*)'),
+
+    # 最後の行から氏名らしき文字列を抽出
+    ((), rf'([^\s\n（）【】、。]*{_GIVEN_NAME_ALT}[^\s\n]*)\s*$'),
+    ((), rf'([^\s\n（）【】、。]*{_FAMILY_NAME_ALT}[^\s\n]*)\s*$'),
+
+    # 基本形式（氏名っぽい文字列）
+    (('連絡先',), r'連絡先[：:]\s*([^\s\n（）【】、。]+)'),
+    (('担当',), r'担当[：:]\s*([^\s\n（）【】、。]+)'),
+    (('投稿者',), r'投稿者[：:]\s*([^\s\n（）【】、。]+)'),
+    (('主催',), r'主催[：:]\s*([^\s\n（）【】、。]+)'),
+    (('問い合わせ',), r'問い合わせ[：:]\s*([^\s\n（）【】、。]+)'),
+])
+_PHONE_ONLY_RE = re.compile(r'^[0-9\-\(\)]+$')
+
+# 氏名クリーンアップ用パターン
+_NAME_SYMBOL_TABLE = str.maketrans('', '', '（）()【】[]「」『』')
+_CONTACT_CHAR_RE = re.compile(r'[0-9\-@.]')
+
+# 都道府県名（上から優先）
+_PREFECTURES = ('東京都', '神奈川県', '千葉県', '埼玉県', '大阪府', '愛知県', '福岡県', '北海道')
+_GENERIC_PREFECTURE_PATTERNS = tuple(re.compile(pattern) for pattern in [
+    r'([^県都府道]+県)',
+    r'([^県都府道]+府)',
+    r'([^県都府道]+都)'
+])
+
+# 主要都市名 → 都道府県（上から優先）
+_CITY_TO_PREFECTURE = {
+    '横浜': '神奈川県', '川崎': '神奈川県', '相模原': '神奈川県',
+    '千葉': '千葉県', '船橋': '千葉県', '松戸': '千葉県',
+    'さいたま': '埼玉県', '川口': '埼玉県', '所沢': '埼玉県',
+    '大阪': '大阪府', '堺': '大阪府', '東大阪': '大阪府',
+    '名古屋': '愛知県', '豊田': '愛知県', '岡崎': '愛知県',
+    '福岡': '福岡県', '北九州': '福岡県', '久留米': '福岡県',
+    '札幌': '北海道', '函館': '北海道', '旭川': '北海道',
+}
+
+# 集合時間パターン（上から優先）: (必須文字列, パターン, 午前/午後区分)
+# 必須文字列を含まない本文では正規表現を実行しない
+_TIME_PATTERNS = tuple((literals, re.compile(pattern), period) for literals, pattern, period in [
+    (('集合時間', ':'), r'集合時間[：:]\s*(\d{1,2}):(\d{2})', None),
+    (('集合', ':'), r'集合[：:]\s*(\d{1,2}):(\d{2})', None),
+    (('集合', ':'), r'(\d{1,2}):(\d{2})\s*集合', None),
+    (('に集合', ':'), r'(\d{1,2}):(\d{2})\s*に集合', None),
+    (('午前', ':'), r'午前\s*(\d{1,2}):(\d{2})', '午前'),
+    (('午後', ':'), r'午後\s*(\d{1,2}):(\d{2})', '午後'),
+    (('時', '分', '集合'), r'(\d{1,2})時(\d{2})分\s*集合', None),
+    (('時', '分'), r'(\d{1,2})時(\d{2})分', None),
+])
+
+# 曜日表記（datetime.weekday()の順）
+_WEEKDAYS = ("月", "火", "水", "木", "金", "土", "日")
+
+# 緊急度別のスタイル: (入力期限か, 前日以内か) → 値
+# ヘッダー: (タイトル書式, 背景色, 絵文字)
+_HEADER_STYLES = {
+    (True, True): ("📝 参加可否のご回答をお願いします（{day_word}期限）", "#FF5722", "🚨"),
+    (True, False): ("� 参加可否のご回答をお願いします（{days}日後期限）", "#FF9800", "⏰"),
+    (False, True): ("🎯 {day_word}開催予定のイベントについて", "#4CAF50", "📢"),
+    (False, False): ("📅 {days}日後開催予定のイベントについて", "#2196F3", "📋"),
+}
+# 主要セクション: (メインメッセージ書式, サブメッセージ書式, 文字色)
+_MAIN_MESSAGE_STYLES = {
+    (True, True): ("🚨 参加・欠席のご回答期限が迫っています", "お忙しい中恐れ入りますが、参加可否のご回答をお願いいたします。", "#FF5722"),
+    (True, False): ("📝 参加・欠席のご回答をお願いします", "期限まで{days}日です。ご都合をお聞かせください。", "#FF9800"),
+    (False, True): ("🎯 {day_word}開催予定です", "最終確認として、参加予定の方は準備をお願いします。", "#4CAF50"),
+    (False, False): ("📅 {days}日後に開催予定です", "参加可否をまだご回答いただいていない方は、お早めにお知らせください。", "#2196F3"),
+}
+
+
+def _day_word(days_until: int) -> str:
+    """前日以内のイベントの日付表現（本日/明日）"""
+    return '本日' if days_until == 0 else '明日'
+
+
+# 天気テキスト解析用パターン
+_WEATHER_TEMP_RE = re.compile(r'(\d+(?:\.\d+)?(?:℃|°C))')
+_WEATHER_PERCENT_RE = re.compile(r'(\d+%)')
+# 天気サマリー用: 天気を表す語と、サマリー対象テキストの階層（body直下を1とする）
+_WEATHER_CONDITION_RE = re.compile(r'晴れ|曇り|雨|雪|霧')
+_SUMMARY_TEXT_DEPTH = 4
+# 数値部分のみを取り出すパターン（スポーツ向けアドバイス判定用、湿度・降水確率は共通）
+_TEMP_VALUE_RE = re.compile(r'(\d+(?:\.\d+)?)(?:℃|°C)')
+_PERCENT_VALUE_RE = re.compile(r'(\d+)%')
+
+# リマインダー本文の固定ノード（読み取り専用として全Flexで共有）
+_SEPARATOR_LG = {"type": "separator", "margin": "lg"}
+_DATE_ICON = {"type": "text", "text": "📅", "size": "md", "flex": 1}
+_LOCATION_ICON = {"type": "text", "text": "📍", "size": "md", "flex": 1}
+_EVENT_DETAIL_TITLE = {"type": "text", "text": "📋 イベント詳細", "size": "sm", "weight": "bold", "color": "#4A5568", "margin": "none"}
+
+# 天候セクションの固定ノード（読み取り専用として全Flexで共有）
+_WEATHER_SECTION_TITLE = {"type": "text", "text": "⚽ スポーツ向け天候情報", "size": "sm", "weight": "bold", "color": "#4A5568"}
+_VENUE_LABEL = {"type": "text", "text": "📍 会場:", "size": "xs", "color": "#718096", "flex": 2}
+_TEMPERATURE_LABEL = {"type": "text", "text": "🌡️ 気温:", "size": "xs", "color": "#718096", "flex": 2}
+_HUMIDITY_LABEL = {"type": "text", "text": "💧 湿度:", "size": "xs", "color": "#718096", "flex": 2}
+_PRECIPITATION_LABEL = {"type": "text", "text": "☔ 降水確率:", "size": "xs", "color": "#718096", "flex": 2}
+_ADVICE_ICON = {"type": "text", "text": "💡", "size": "xs", "flex": 1}
+_WEATHER_DISCLAIMER = {"type": "text", "text": "※ 天候により変更の可能性があります", "size": "xxs", "color": "#A0AEC0", "align": "center", "margin": "sm"}
+
+# イベント内容の解析処理（純粋な文字列処理のため、同じ本文の再解析はキャッシュで省略）
+@lru_cache(maxsize=512)
+def _extract_location_info_cached(event_content: str) -> Optional[str]:
+    """イベント内容から具体的な場所情報を抽出（結果をキャッシュ）"""
+    for literals, pattern in _LOCATION_PATTERNS:
+        if not all(literal in event_content for literal in literals):
+            continue
+
+        match = pattern.search(event_content)
+        if match:
+            # 全パターンとも第1グループが具体的な地名
+            location_text = match.group(1).strip()
+
+            # 調整さん関連の文字列を除外
+            if not _LINK_EXCLUDE_RE.search(location_text):
+                # 余分な文字列をクリーンアップ
+                location_text = _clean_specific_location_name(location_text)
+                return location_text
+
+    return None
+
+
+def _clean_specific_location_name(raw_location: str) -> str:
+    """具体的な場所名をクリーンアップして、施設名のみを抽出"""
+    if not raw_location:
+        return ""
+
+    # 不要な文字列を除去
+    location = raw_location.strip()
+
+    # 都道府県プレフィックスを除去（既に抽出済みの場合）
+    location = _PREFECTURE_PREFIX_RE.sub('', location)
+
+    # カンマや句点で区切られた最初の部分のみを取得（追加情報を除去）
+    location = _LOCATION_SPLIT_RE.split(location)[0].strip()
+
+    # 括弧以降の情報を除去
+    location = _BRACKET_TAIL_RE.sub('', location)
+
+    # 「にて」「で」「において」などの助詞と「開催」「実施」などの不要な文言を除去
+    location = _TAIL_CLEANUP_RE.sub('', location, count=1)
+
+    # 公園+野球場のパターンを正規化
+    if '公園' in location and '野球場' not in location:
+        # 「〇〇公園」→「〇〇公園野球場」（野球場がない場合のみ）
+        if _PARK_TAIL_RE.search(location):
+            location = location + '野球場'
+
+    # 連続する空白を単一の空白に変換し、前後の空白を除去
+    location = _WHITESPACE_RE.sub(' ', location).strip()
+
+    return location
+
+
+@lru_cache(maxsize=512)
+def _clean_event_content_for_display_cached(event_content: str) -> str:
+    """イベント内容から調整さん関連情報を除外（結果をキャッシュ）"""
+    if not event_content:
+        return ""
+
+    # 空行と除外キーワード・パターンに該当する行を1パスで除外
+    # （splitlines()は\r等でも分割してしまうため、従来どおり\nで分割する）
+    return '\n'.join(
+        line for line in map(str.strip, event_content.split('\n'))
+        if line and not _DISPLAY_EXCLUDE_RE.search(line)
+    )
+
+
+@lru_cache(maxsize=512)
+def _extract_author_info_cached(event_content: str) -> str:
+    """イベント内容から投稿者の氏名を抽出（結果をキャッシュ）"""
+    for literals, pattern in _AUTHOR_PATTERNS:
+        if not all(literal in event_content for literal in literals):
+            continue
+
+        match = pattern.search(event_content)
+        if match:
+            author_name = match.group(1).strip()
+
+            # 不要な文字列を除外
+            if not _AUTHOR_EXCLUDE_RE.search(author_name):
+                # 数字のみ、記号のみ、短すぎる名前を除外
+                if (len(author_name) >= 2 and
+                    not author_name.isdigit() and
+                    not _PHONE_ONLY_RE.match(author_name) and
+                    len(author_name) <= 10):  # 氏名として妥当な長さ
+                    return _clean_author_name(author_name)
+
+    return "投稿者"
+
+
+def _clean_author_name(raw_name: str) -> str:
+    """抽出された氏名をクリーンアップ"""
+    if not raw_name:
+        return "投稿者"
+
+    # 前後の空白を除去
+    name = raw_name.strip()
+
+    # 不要な記号を除去
+    name = name.translate(_NAME_SYMBOL_TABLE)
+
+    # 連続する空白を単一の空白に変換
+    name = _WHITESPACE_RE.sub(' ', name)
+
+    # 電話番号やメールアドレスの一部が含まれていないかチェック
+    if _CONTACT_CHAR_RE.search(name) and len(name) > 6:
+        return "投稿者"
+
+    return name.strip() if name.strip() else "投稿者"
+
+
+@lru_cache(maxsize=512)
+def _extract_gathering_time_cached(event_content: str) -> Optional[str]:
+    """イベント内容から集合時間を抽出（結果をキャッシュ）"""
+    for literals, pattern, period in _TIME_PATTERNS:
+        if not all(literal in event_content for literal in literals):
+            continue
+
+        match = pattern.search(event_content)
+        if match:
+            hour = int(match.group(1))
+            minute = int(match.group(2))
+
+            # 午後の場合は12時間加算（午後12時は例外）
+            if period == '午後' and hour != 12:
+                hour += 12
+            elif period == '午前' and hour == 12:
+                hour = 0
+
+            return f"{hour:02d}:{minute:02d}"
+
+    return None
+
+
+@lru_cache(maxsize=512)
+def _sports_advice_cached(temperature: str, humidity: str, precipitation: str) -> str:
+    """天候情報に基づいてスポーツ向けの具体的なアドバイスを生成（結果をキャッシュ）"""
+    try:
+        # 気温を数値として抽出
+        temp_match = _TEMP_VALUE_RE.search(temperature)
+        temp_value = float(temp_match.group(1)) if temp_match else 20.0
+
+        # 湿度を数値として抽出
+        humidity_match = _PERCENT_VALUE_RE.search(humidity)
+        humidity_value = int(humidity_match.group(1)) if humidity_match else 50
+
+        # 降水確率を数値として抽出
+        precipitation_match = _PERCENT_VALUE_RE.search(precipitation)
+        precipitation_value = int(precipitation_match.group(1)) if precipitation_match else 0
+
+        # スポーツ向けアドバイスの生成
+        if precipitation_value >= 70:
+            return "☔ 雨天のため室内での練習や雨具の準備を。滑りやすいので注意してください"
+        elif precipitation_value >= 40:
+            return "🌦️ 雨の可能性があります。念のため雨具を持参し、グラウンド状態にご注意を"
+        elif precipitation_value >= 20:
+            return "☁️ 曇り空ですが運動には適しています。急な雨に備え軽い雨具があると安心"
+
+        # 気温に基づくアドバイス
+        if temp_value >= 30:
+            if humidity_value >= 70:
+                return "🥵 高温多湿です。熱中症対策必須！こまめな水分・塩分補給と適度な休憩を"
+            else:
+                return "☀️ 高温注意！日陰での休憩、帽子・冷却タオルの準備、水分補給をお忘れなく"
+        elif temp_value >= 25:
+            if humidity_value >= 70:
+                return "💧 蒸し暑い日です。汗をかきやすいので着替えと水分補給をしっかりと"
+            else:
+                return "🌤️ スポーツ日和！ただし直射日光対策と水分補給は忘れずに"
+        elif temp_value >= 20:
+            return "👍 運動に最適な気温です。軽い準備運動から始めて怪我の予防を心がけましょう"
+        elif temp_value >= 15:
+            return "🧥 少し肌寒いです。ウォーミングアップをしっかり行い、体を温めてから運動開始を"
+        elif temp_value >= 10:
+            return "❄️ 寒い日です。防寒対策と十分なウォーミングアップで怪我を防ぎましょう"
+        else:
+            return "🧣 非常に寒いです。防寒具必須！屋内での活動も検討してください"
+
+    except Exception as e:
+        logger.warning("スポーツアドバイス生成エラー: %s", e)
+        return "⚽ スポーツを楽しんでください！天候に応じた準備と安全対策をお忘れなく"
+
+
 class ReminderFlexCustomizer:
     """リマインダー用Flex Messageカスタマイザー"""
 
@@ -49,9 +420,22 @@ class ReminderFlexCustomizer:
             return customized_flex
 
         except Exception as e:
-            print(f"[REMINDER_FLEX] カスタマイズエラー: {e}")
+            logger.warning("[REMINDER_FLEX] カスタマイズエラー: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return base_flex
 
+    def customize_batch(self, items: Iterable[Tuple[Dict, Dict]]) -> List[Dict]:
+        """
+        複数のリマインダーをまとめてカスタマイズ
+        同じノートから複数のリマインダーを生成する場合も解析キャッシュを共有する
+
+        Args:
+            items (Iterable[Tuple[Dict, Dict]]): (基本の天気Flex Message, ノート情報) の組
+
+        Returns:
+            List[Dict]: カスタマイズされたFlex Message（入力と同じ順序）
+        """
+        return [self.customize_weather_flex_for_reminder(base_flex, note) for base_flex, note in items]
+
     def _create_custom_reminder_flex(self, event_content: str, event_date: datetime,
                                     days_until: int, is_input_deadline: bool, base_flex: Dict) -> Dict:
         """
@@ -70,30 +454,12 @@ class ReminderFlexCustomizer:
             Dict: カスタムFlex Message
         """
         # 日付フォーマット
-        formatted_date = event_date.strftime("%Y年%m月%d日")
-        weekdays = ["月", "火", "水", "木", "金", "土", "日"]
-        weekday = weekdays[event_date.weekday()]
-        date_with_weekday = f"{formatted_date}({weekday})"
+        date_with_weekday = f"{event_date.strftime('%Y年%m月%d日')}({_WEEKDAYS[event_date.weekday()]})"
 
-        # 調整さん依頼を主体とするタイトル生成
-        if is_input_deadline:
-            if days_until <= 1:
-                title = f"📝 参加可否のご回答をお願いします（{'本日' if days_until == 0 else '明日'}期限）"
-                title_color = "#FF5722"
-                urgency_emoji = "🚨"
-            else:
-                title = f"� 参加可否のご回答をお願いします（{days_until}日後期限）"
-                title_color = "#FF9800"
-                urgency_emoji = "⏰"
-        else:
-            if days_until <= 1:
-                title = f"🎯 {'本日' if days_until == 0 else '明日'}開催予定のイベントについて"
-                title_color = "#4CAF50"
-                urgency_emoji = "📢"
-            else:
-                title = f"📅 {days_until}日後開催予定のイベントについて"
-                title_color = "#2196F3"
-                urgency_emoji = "📋"
+        # 調整さん依頼を主体とするタイトル生成（入力期限か・前日以内かで4通り）
+        urgency_key = (bool(is_input_deadline), days_until <= 1)
+        title_template, title_color, urgency_emoji = _HEADER_STYLES[urgency_key]
+        title = title_template.format(day_word=_day_word(days_until), days=days_until)
 
         # 場所情報を抽出
         location_info = self._extract_location_info(event_content)
@@ -140,13 +506,10 @@ class ReminderFlexCustomizer:
                     "spacing": "lg",
                     "contents": [
                         # 主要コンテンツ：調整さん確認・入力依頼
-                        self._create_main_reminder_section(event_content, date_with_weekday, is_input_deadline, days_until),
+                        self._create_main_reminder_section(event_content, date_with_weekday, is_input_deadline, days_until, location_info),
 
                         # 区切り線
-                        {
-                            "type": "separator",
-                            "margin": "lg"
-                        },
+                        _SEPARATOR_LG,
 
                         # 付属情報：詳細な天候情報
                         self._create_compact_weather_section(location_info, weather_info)
@@ -168,57 +531,7 @@ class ReminderFlexCustomizer:
         Returns:
             Optional[str]: 具体的な場所情報
         """
-        location_patterns = [
-            # 明示的な場所表記（最優先）
-            r'場所[：:]\s*([^\n、。，]+)',
-            r'会場[：:]\s*([^\n、。，]+)',
-            r'開催地[：:]\s*([^\n、。，]+)',
-            r'集合場所[：:]\s*([^\n、。，]+)',
-            r'【大会会場】\s*([^\n、。，]+)',
-
-            # 具体的な施設名パターン（区市町村＋施設名）
-            r'([^都道府県\n]*区[^\n]*球場)',
-            r'([^都道府県\n]*市[^\n]*球場)',
-            r'([^都道府県\n]*町[^\n]*球場)',
-            r'([^都道府県\n]*区[^\n]*グラウンド)',
-            r'([^都道府県\n]*市[^\n]*グラウンド)',
-            r'([^都道府県\n]*町[^\n]*グラウンド)',
-
-            # ドーム・スタジアムなどの施設（「にて」「で」などの助詞を除く）
-            r'([^都道府県\n、。]*ドーム)(?:にて|で|において)?',
-            r'([^都道府県\n、。]*スタジアム)(?:にて|で|において)?',
-            r'([^都道府県\n、。]*野球場)(?:にて|で|において)?',
-            r'([^都道府県\n、。]*運動場)(?:にて|で|において)?',
-            r'([^都道府県\n、。]*公園)(?:野球場|にて|で|において)?',
-
-            # 都道府県付きの場合は具体的な地域を抽出
-            r'東京都([^東京都\n]*区[^\n]*球場)',
-            r'東京都([^東京都\n]*市[^\n]*球場)',
-            r'神奈川県([^神奈川県\n]*区[^\n]*球場)',
-            r'神奈川県([^神奈川県\n]*市[^\n]*球場)',
-            r'千葉県([^千葉県\n]*区[^\n]*球場)',
-            r'千葉県([^千葉県\n]*市[^\n]*球場)',
-            r'埼玉県([^埼玉県\n]*区[^\n]*球場)',
-            r'埼玉県([^埼玉県\n]*市[^\n]*球場)'
-        ]
-
-        for pattern in location_patterns:
-            match = re.search(pattern, event_content, re.MULTILINE)
-            if match:
-                if pattern.startswith('場所') or pattern.startswith('会場') or pattern.startswith('開催地') or pattern.startswith('集合場所') or pattern.startswith('【大会会場】'):
-                    location_text = match.group(1).strip()
-                else:
-                    # 括弧内のグループ（具体的な地名）を取得
-                    location_text = match.group(1).strip() if '(' in pattern else match.group(0).strip()
-
-                # 調整さん関連の文字列を除外
-                exclude_keywords = ["調整さん", "chouseisan", "URL", "https://", "http://"]
-                if not any(keyword in location_text for keyword in exclude_keywords):
-                    # 余分な文字列をクリーンアップ
-                    location_text = self._clean_specific_location_name(location_text)
-                    return location_text
-
-        return None
+        return _extract_location_info_cached(event_content)
 
     def _clean_specific_location_name(self, raw_location: str) -> str:
         """
@@ -230,37 +543,7 @@ class ReminderFlexCustomizer:
         Returns:
             str: クリーンアップされた具体的な場所名
         """
-        if not raw_location:
-            return ""
-
-        # 不要な文字列を除去
-        location = raw_location.strip()
-
-        # 都道府県プレフィックスを除去（既に抽出済みの場合）
-        location = re.sub(r'^(東京都|神奈川県|千葉県|埼玉県|大阪府|愛知県|福岡県|北海道)\s*', '', location)
-
-        # カンマや句点で区切られた最初の部分のみを取得（追加情報を除去）
-        location = re.split(r'[、。，,]', location)[0].strip()
-
-        # 括弧以降の情報を除去
-        location = re.sub(r'[（）()【】\[\]].*$', '', location)
-
-        # 「にて」「で」「において」などの助詞を除去
-        location = re.sub(r'(にて|において|で)$', '', location)
-
-        # 「開催」「実施」などの不要な文言を除去
-        location = re.sub(r'(開催|実施|にて開催|で開催)$', '', location)
-
-        # 公園+野球場のパターンを正規化
-        if '公園' in location and '野球場' not in location:
-            # 「〇〇公園」→「〇〇公園野球場」（野球場がない場合のみ）
-            if re.search(r'公園$', location):
-                location = location + '野球場'
-
-        # 連続する空白を単一の空白に変換し、前後の空白を除去
-        location = re.sub(r'\s+', ' ', location).strip()
-
-        return location
+        return _clean_specific_location_name(raw_location)
 
     def _clean_event_content_for_display(self, event_content: str) -> str:
         """
@@ -272,43 +555,7 @@ class ReminderFlexCustomizer:
         Returns:
             str: クリーンアップされたイベント内容
         """
-        if not event_content:
-            return ""
-
-        lines = event_content.strip().split('\n')
-        cleaned_lines = []
-
-        exclude_keywords = ["調整さん", "chouseisan", "URL", "https://", "http://", "↑必ず", "必ずご入力"]
-        exclude_patterns = [
-            r'調整さん.*入力',
-            r'.*URL.*入力',
-            r'↑.*ください',
-            r'.*chouseisan\.com.*'
-        ]
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # 除外キーワードをチェック
-            should_exclude = False
-            for keyword in exclude_keywords:
-                if keyword in line:
-                    should_exclude = True
-                    break
-
-            # 除外パターンをチェック
-            if not should_exclude:
-                for pattern in exclude_patterns:
-                    if re.search(pattern, line, re.IGNORECASE):
-                        should_exclude = True
-                        break
-
-            if not should_exclude:
-                cleaned_lines.append(line)
-
-        return '\n'.join(cleaned_lines)
+        return _clean_event_content_for_display_cached(event_content)
 
     def _extract_author_info(self, event_content: str) -> str:
         """
@@ -321,54 +568,7 @@ class ReminderFlexCustomizer:
         Returns:
             str: 投稿者の氏名
         """
-        # より正確な氏名抽出パターン
-        author_patterns = [
-            # 基本パターン（姓名形式）
-            r'連絡先[：:]\s*([^\s\n（）【】、。]+[太郎次郎三郎四郎花子美子恵子春子夏子秋子冬子][^\s\n]*)',
-            r'担当[：:]\s*([^\s\n（）【】、。]+[太郎次郎三郎四郎花子美子恵子春子夏子秋子冬子][^\s\n]*)',
-            r'投稿者[：:]\s*([^\s\n（）【】、。]+[太郎次郎三郎四郎花子美子恵子春子夏子秋子冬子][^\s\n]*)',
-            r'主催[：:]\s*([^\s\n（）【】、。]+[太郎次郎三郎四郎花子美子恵子春子夏子秋子冬子][^\s\n]*)',
-            r'問い合わせ[：:]\s*([^\s\n（）【】、。]+[太郎次郎三郎四郎花子美子恵子春子夏子秋子冬子][^\s\n]*)',
-
-            # 一般的な氏名パターン（姓+名の形式）
-            r'連絡先[：:]\s*([^\s\n（）【】、。]*[山田田中佐藤鈴木高橋小林松本中村石川前田青木藤田井上][^\s\n]*)',
-            r'担当[：:]\s*([^\s\n（）【】、。]*[山田田中佐藤鈴木高橋小林松本中村石川前田青木藤田井上][^\s\n]*)',
-            r'投稿者[：:]\s*([^\s\n（）【】、。]*[山田田中佐藤鈴木高橋小林松本中村石川前田青木藤田井上][^\s\n]*)',
-            r'主催[：:]\s*([^\s\n（）【】、。]*[山田田中佐藤鈴木高橋小林松本中村石川前田青木藤田井上][^\s\n]*)',
-            r'問い合わせ[：:]\s*([^\s\n（）【】、。]*[山田田中佐藤鈴木高橋小林松本中村石川前田青木藤田井上][^\s\n]*)',
-
-            # より寛容なパターン（カタカナ氏名も含む）
-            r'連絡先[：:]\s*([^\s\n（）【】、。]*[タナカヤマダサトウスズキタカハシ][^\s\n]*)',
-            r'担当[：:]\s*([^\s\n（）【】、。]*[タナカヤマダサトウスズキタカハシ][^\s\n]*)',
-
-            # 最後の行から氏名らしき文字列を抽出
-            r'([^\s\n（）【】、。]*[太郎次郎三郎四郎花子美子恵子春子夏子秋子冬子][^\s\n]*)\s*$',
-            r'([^\s\n（）【】、。]*[山田田中佐藤鈴木高橋小林松本中村石川前田青木藤田井上][^\s\n]*)\s*$',
-
-            # 基本形式（氏名っぽい文字列）
-            r'連絡先[：:]\s*([^\s\n（）【】、。]+)',
-            r'担当[：:]\s*([^\s\n（）【】、。]+)',
-            r'投稿者[：:]\s*([^\s\n（）【】、。]+)',
-            r'主催[：:]\s*([^\s\n（）【】、。]+)',
-            r'問い合わせ[：:]\s*([^\s\n（）【】、。]+)',
-        ]
-
-        for pattern in author_patterns:
-            match = re.search(pattern, event_content, re.MULTILINE)
-            if match:
-                author_name = match.group(1).strip()
-
-                # 不要な文字列を除外
-                exclude_keywords = ["調整さん", "chouseisan", "URL", "https://", "http://", "Tel", "電話", "番号", "メール", "@"]
-                if not any(keyword in author_name for keyword in exclude_keywords):
-                    # 数字のみ、記号のみ、短すぎる名前を除外
-                    if (len(author_name) >= 2 and
-                        not author_name.isdigit() and
-                        not re.match(r'^[0-9\-\(\)]+$', author_name) and
-                        len(author_name) <= 10):  # 氏名として妥当な長さ
-                        return self._clean_author_name(author_name)
-
-        return "投稿者"
+        return _extract_author_info_cached(event_content)
 
     def _clean_author_name(self, raw_name: str) -> str:
         """
@@ -380,23 +580,7 @@ class ReminderFlexCustomizer:
         Returns:
             str: クリーンアップされた氏名
         """
-        if not raw_name:
-            return "投稿者"
-
-        # 前後の空白を除去
-        name = raw_name.strip()
-
-        # 不要な記号を除去
-        name = re.sub(r'[（）()【】\[\]「」『』]', '', name)
-
-        # 連続する空白を単一の空白に変換
-        name = re.sub(r'\s+', ' ', name)
-
-        # 電話番号やメールアドレスの一部が含まれていないかチェック
-        if re.search(r'[0-9\-@.]', name) and len(name) > 6:
-            return "投稿者"
-
-        return name.strip() if name.strip() else "投稿者"
+        return _clean_author_name(raw_name)
 
     def _clean_location_name(self, raw_location: str) -> str:
         """
@@ -412,55 +596,19 @@ class ReminderFlexCustomizer:
             return "東京都"
 
         # 都道府県名を抽出
-        prefecture_patterns = [
-            r'(東京都)',
-            r'(神奈川県)',
-            r'(千葉県)',
-            r'(埼玉県)',
-            r'(大阪府)',
-            r'(愛知県)',
-            r'(福岡県)',
-            r'(北海道)',
-            r'([^県都府道]+県)',
-            r'([^県都府道]+府)',
-            r'([^県都府道]+都)'
-        ]
-
-        for pattern in prefecture_patterns:
-            match = re.search(pattern, raw_location)
+        for prefecture in _PREFECTURES:
+            if prefecture in raw_location:
+                return prefecture
+
+        for pattern in _GENERIC_PREFECTURE_PATTERNS:
+            match = pattern.search(raw_location)
             if match:
                 return match.group(1)
 
-        # 主要都市名を抽出
-        city_patterns = [
-            r'(横浜|川崎|相模原)',  # 神奈川
-            r'(千葉|船橋|松戸)',    # 千葉
-            r'(さいたま|川口|所沢)', # 埼玉
-            r'(大阪|堺|東大阪)',    # 大阪
-            r'(名古屋|豊田|岡崎)',  # 愛知
-            r'(福岡|北九州|久留米)', # 福岡
-            r'(札幌|函館|旭川)'     # 北海道
-        ]
-
-        for pattern in city_patterns:
-            match = re.search(pattern, raw_location)
-            if match:
-                city = match.group(1)
-                # 市名に対応する都道府県を返す
-                if city in ['横浜', '川崎', '相模原']:
-                    return '神奈川県'
-                elif city in ['千葉', '船橋', '松戸']:
-                    return '千葉県'
-                elif city in ['さいたま', '川口', '所沢']:
-                    return '埼玉県'
-                elif city in ['大阪', '堺', '東大阪']:
-                    return '大阪府'
-                elif city in ['名古屋', '豊田', '岡崎']:
-                    return '愛知県'
-                elif city in ['福岡', '北九州', '久留米']:
-                    return '福岡県'
-                elif city in ['札幌', '函館', '旭川']:
-                    return '北海道'
+        # 主要都市名に対応する都道府県を返す
+        for city, prefecture in _CITY_TO_PREFECTURE.items():
+            if city in raw_location:
+                return prefecture
 
         # デフォルトは東京都
         return "東京都"
@@ -475,32 +623,7 @@ class ReminderFlexCustomizer:
         Returns:
             Optional[str]: 集合時間（HH:MM形式）
         """
-        time_patterns = [
-            r'集合時間[：:]\s*(\d{1,2}):(\d{2})',
-            r'集合[：:]\s*(\d{1,2}):(\d{2})',
-            r'(\d{1,2}):(\d{2})\s*集合',
-            r'(\d{1,2}):(\d{2})\s*に集合',
-            r'午前\s*(\d{1,2}):(\d{2})',
-            r'午後\s*(\d{1,2}):(\d{2})',
-            r'(\d{1,2})時(\d{2})分\s*集合',
-            r'(\d{1,2})時(\d{2})分',
-        ]
-
-        for pattern in time_patterns:
-            match = re.search(pattern, event_content)
-            if match:
-                hour = int(match.group(1))
-                minute = int(match.group(2))
-
-                # 午後の場合は12時間加算（午後12時は例外）
-                if '午後' in pattern and hour != 12:
-                    hour += 12
-                elif '午前' in pattern and hour == 12:
-                    hour = 0
-
-                return f"{hour:02d}:{minute:02d}"
-
-        return None
+        return _extract_gathering_time_cached(event_content)
 
     def _calculate_reminder_time(self, gathering_time: str) -> Optional[str]:
         """
@@ -548,14 +671,7 @@ class ReminderFlexCustomizer:
             "layout": "vertical",
             "spacing": "xs",
             "contents": [
-                {
-                    "type": "text",
-                    "text": "📋 イベント詳細",
-                    "size": "sm",
-                    "weight": "bold",
-                    "color": "#4A5568",
-                    "margin": "none"
-                },
+                _EVENT_DETAIL_TITLE,
                 {
                     "type": "text",
                     "text": display_content,
@@ -590,6 +706,10 @@ class ReminderFlexCustomizer:
             "advice": "天候情報を確認してください"
         }
 
+        # 天気Flexがない場合は既定値のまま返す
+        if not base_flex:
+            return weather_info
+
         try:
             # contentsがある場合とない場合の両方に対応
             flex_contents = base_flex.get("contents", base_flex)
@@ -612,15 +732,14 @@ class ReminderFlexCustomizer:
                 self._extract_weather_data_recursive(body_contents, weather_info)
 
         except Exception as e:
-            print(f"❌ 天気情報抽出エラー: {e}")
-            import traceback
-            traceback.print_exc()
+            # トレースバックの整形はDEBUG有効時のみ
+            logger.warning("❌ 天気情報抽出エラー: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
 
         return weather_info
 
     def _extract_weather_data_recursive(self, contents, weather_info):
         """
-        再帰的に天気データを抽出する
+        天気データを抽出する（明示的なスタックで深さ優先に走査）
 
         Args:
             contents: 抽出対象のcontents配列
@@ -629,17 +748,27 @@ class ReminderFlexCustomizer:
         if not isinstance(contents, list):
             return
 
-        for section in contents:
+        # 元の並び順で処理するため、逆順に積んで末尾から取り出す
+        stack = contents[::-1]
+        while stack:
+            section = stack.pop()
             if not isinstance(section, dict):
                 continue
 
+            section_type = section.get("type")
+
             # テキスト要素の場合
-            if section.get("type") == "text":
+            if section_type == "text":
                 text = section.get("text", "")
+                # テキスト解析は未取得の項目しか埋めないため、全項目取得済みなら省略
+                # （ラベル：値の行は後勝ちで上書きするため、走査自体は最後まで続ける）
+                if isinstance(text, str) and "情報なし" not in (
+                        weather_info["temperature"], weather_info["humidity"], weather_info["precipitation"]):
+                    continue
                 self._parse_weather_text(text, weather_info)
 
             # ボックス要素の場合
-            elif section.get("type") == "box":
+            elif section_type == "box":
                 # 水平レイアウトの場合（ラベル：値の形式）
                 if section.get("layout") == "horizontal":
                     horizontal_contents = section.get("contents", [])
@@ -651,13 +780,14 @@ class ReminderFlexCustomizer:
                         if label_text and value_text:
                             self._categorize_weather_info(label_text, value_text, weather_info)
 
-                # contents配列がある場合は再帰処理
-                if "contents" in section:
-                    self._extract_weather_data_recursive(section["contents"], weather_info)
+                # contents配列がある場合は続けて走査
+                children = section.get("contents")
+                if isinstance(children, list):
+                    stack.extend(reversed(children))
 
     def _extract_text_from_element(self, element):
         """
-        要素からテキストを抽出
+        要素からテキストを抽出（深さ優先で最初に見つかったテキスト）
 
         Args:
             element: Flex要素
@@ -665,19 +795,22 @@ class ReminderFlexCustomizer:
         Returns:
             str: 抽出されたテキスト
         """
-        if not isinstance(element, dict):
-            return ""
-
-        # 直接テキスト要素の場合
-        if element.get("type") == "text":
-            return element.get("text", "").strip()
+        stack = [element]
+        while stack:
+            element = stack.pop()
+            if not isinstance(element, dict):
+                continue
 
-        # contentsがある場合は再帰的に探す
-        if "contents" in element:
-            for sub_element in element["contents"]:
-                text = self._extract_text_from_element(sub_element)
+            # 直接テキスト要素の場合
+            if element.get("type") == "text":
+                text = element.get("text", "").strip()
                 if text:
                     return text
+                continue
+
+            # contentsがある場合は子要素を探す
+            if "contents" in element:
+                stack.extend(reversed(list(element["contents"])))
 
         return ""
 
@@ -693,18 +826,18 @@ class ReminderFlexCustomizer:
             return
 
         # 温度情報
-        temp_match = re.search(r'(\d+(?:\.\d+)?(?:℃|°C))', text)
+        temp_match = _WEATHER_TEMP_RE.search(text)
         if temp_match and weather_info["temperature"] == "情報なし":
             weather_info["temperature"] = temp_match.group(1)
 
         # 湿度情報
-        humidity_match = re.search(r'(\d+%)', text)
+        humidity_match = _WEATHER_PERCENT_RE.search(text)
         if humidity_match and "湿度" in text and weather_info["humidity"] == "情報なし":
             weather_info["humidity"] = humidity_match.group(1)
 
         # 降水確率情報
         if ("降水" in text or "雨" in text) and weather_info["precipitation"] == "情報なし":
-            precip_match = re.search(r'(\d+%)', text)
+            precip_match = _WEATHER_PERCENT_RE.search(text)
             if precip_match:
                 weather_info["precipitation"] = precip_match.group(1)
 
@@ -741,7 +874,8 @@ class ReminderFlexCustomizer:
         return ""
 
     def _create_main_reminder_section(self, event_content: str, date_with_weekday: str,
-                                    is_input_deadline: bool, days_until: int) -> Dict:
+                                    is_input_deadline: bool, days_until: int,
+                                    location_info: Optional[str] = None) -> Dict:
         """
         調整さん確認・入力依頼の主要セクションを作成
 
@@ -750,32 +884,20 @@ class ReminderFlexCustomizer:
             date_with_weekday (str): 日付（曜日付き）
             is_input_deadline (bool): 入力期限かどうか
             days_until (int): 何日後か
+            location_info (Optional[str]): 抽出済みの場所情報（未指定時はイベント内容から抽出）
 
         Returns:
             Dict: 主要リマインダーセクション
         """
-        # 場所情報を抽出
-        location_info = self._extract_location_info(event_content)
+        # 場所情報を抽出（呼び出し元で抽出済みなら再利用）
+        if location_info is None:
+            location_info = self._extract_location_info(event_content)
 
         # 緊急度に応じたメッセージ
-        if is_input_deadline:
-            if days_until <= 1:
-                main_message = "🚨 参加・欠席のご回答期限が迫っています"
-                sub_message = "お忙しい中恐れ入りますが、参加可否のご回答をお願いいたします。"
-                message_color = "#FF5722"
-            else:
-                main_message = "📝 参加・欠席のご回答をお願いします"
-                sub_message = f"期限まで{days_until}日です。ご都合をお聞かせください。"
-                message_color = "#FF9800"
-        else:
-            if days_until <= 1:
-                main_message = f"🎯 {'本日' if days_until == 0 else '明日'}開催予定です"
-                sub_message = "最終確認として、参加予定の方は準備をお願いします。"
-                message_color = "#4CAF50"
-            else:
-                main_message = f"📅 {days_until}日後に開催予定です"
-                sub_message = "参加可否をまだご回答いただいていない方は、お早めにお知らせください。"
-                message_color = "#2196F3"
+        main_template, sub_template, message_color = _MAIN_MESSAGE_STYLES[(bool(is_input_deadline), days_until <= 1)]
+        day_word = _day_word(days_until)
+        main_message = main_template.format(day_word=day_word, days=days_until)
+        sub_message = sub_template.format(day_word=day_word, days=days_until)
 
         return {
             "type": "box",
@@ -811,12 +933,7 @@ class ReminderFlexCustomizer:
                             "type": "box",
                             "layout": "horizontal",
                             "contents": [
-                                {
-                                    "type": "text",
-                                    "text": "📅",
-                                    "size": "md",
-                                    "flex": 1
-                                },
+                                _DATE_ICON,
                                 {
                                     "type": "text",
                                     "text": date_with_weekday,
@@ -842,12 +959,7 @@ class ReminderFlexCustomizer:
                     "type": "box",
                     "layout": "horizontal",
                     "contents": [
-                        {
-                            "type": "text",
-                            "text": "📍",
-                            "size": "md",
-                            "flex": 1
-                        },
+                        _LOCATION_ICON,
                         {
                             "type": "text",
                             "text": location_info,
@@ -880,13 +992,12 @@ class ReminderFlexCustomizer:
 
         # 重要キーワードを含む行を抽出（調整さん関連は除外）
         important_keywords = ["時間", "集合", "持ち物", "注意", "連絡", "費用", "料金", "締切"]
-        exclude_keywords = ["調整さん", "chouseisan", "URL", "https://", "http://"]
 
         for line in lines:
             line = line.strip()
             if line and len(line) > 3:  # 短すぎる行をスキップ
                 # 調整さん関連の行は除外
-                if any(exclude_keyword in line for exclude_keyword in exclude_keywords):
+                if _LINK_EXCLUDE_RE.search(line):
                     continue
 
                 if any(keyword in line for keyword in important_keywords):
@@ -945,50 +1056,7 @@ class ReminderFlexCustomizer:
         Returns:
             str: スポーツ向けアドバイス
         """
-        try:
-            # 気温を数値として抽出
-            temp_match = re.search(r'(\d+(?:\.\d+)?)(?:℃|°C)', temperature)
-            temp_value = float(temp_match.group(1)) if temp_match else 20.0
-
-            # 湿度を数値として抽出
-            humidity_match = re.search(r'(\d+)(?:%)', humidity)
-            humidity_value = int(humidity_match.group(1)) if humidity_match else 50
-
-            # 降水確率を数値として抽出
-            precipitation_match = re.search(r'(\d+)(?:%)', precipitation)
-            precipitation_value = int(precipitation_match.group(1)) if precipitation_match else 0
-
-            # スポーツ向けアドバイスの生成
-            if precipitation_value >= 70:
-                return "☔ 雨天のため室内での練習や雨具の準備を。滑りやすいので注意してください"
-            elif precipitation_value >= 40:
-                return "🌦️ 雨の可能性があります。念のため雨具を持参し、グラウンド状態にご注意を"
-            elif precipitation_value >= 20:
-                return "☁️ 曇り空ですが運動には適しています。急な雨に備え軽い雨具があると安心"
-
-            # 気温に基づくアドバイス
-            if temp_value >= 30:
-                if humidity_value >= 70:
-                    return "🥵 高温多湿です。熱中症対策必須！こまめな水分・塩分補給と適度な休憩を"
-                else:
-                    return "☀️ 高温注意！日陰での休憩、帽子・冷却タオルの準備、水分補給をお忘れなく"
-            elif temp_value >= 25:
-                if humidity_value >= 70:
-                    return "💧 蒸し暑い日です。汗をかきやすいので着替えと水分補給をしっかりと"
-                else:
-                    return "🌤️ スポーツ日和！ただし直射日光対策と水分補給は忘れずに"
-            elif temp_value >= 20:
-                return "👍 運動に最適な気温です。軽い準備運動から始めて怪我の予防を心がけましょう"
-            elif temp_value >= 15:
-                return "🧥 少し肌寒いです。ウォーミングアップをしっかり行い、体を温めてから運動開始を"
-            elif temp_value >= 10:
-                return "❄️ 寒い日です。防寒対策と十分なウォーミングアップで怪我を防ぎましょう"
-            else:
-                return "🧣 非常に寒いです。防寒具必須！屋内での活動も検討してください"
-
-        except Exception as e:
-            print(f"スポーツアドバイス生成エラー: {e}")
-            return "⚽ スポーツを楽しんでください！天候に応じた準備と安全対策をお忘れなく"
+        return _sports_advice_cached(temperature, humidity, precipitation)
 
     def _create_compact_weather_section(self, location_info: Optional[str], weather_info: Dict) -> Dict:
         """
@@ -1021,26 +1089,14 @@ class ReminderFlexCustomizer:
             "layout": "vertical",
             "spacing": "sm",
             "contents": [
-                {
-                    "type": "text",
-                    "text": "⚽ スポーツ向け天候情報",
-                    "size": "sm",
-                    "weight": "bold",
-                    "color": "#4A5568"
-                },
+                _WEATHER_SECTION_TITLE,
                 # 会場名
                 {
                     "type": "box",
                     "layout": "horizontal",
                     "spacing": "xs",
                     "contents": [
-                        {
-                            "type": "text",
-                            "text": "📍 会場:",
-                            "size": "xs",
-                            "color": "#718096",
-                            "flex": 2
-                        },
+                        _VENUE_LABEL,
                         {
                             "type": "text",
                             "text": venue,
@@ -1058,13 +1114,7 @@ class ReminderFlexCustomizer:
                     "layout": "horizontal",
                     "spacing": "xs",
                     "contents": [
-                        {
-                            "type": "text",
-                            "text": "🌡️ 気温:",
-                            "size": "xs",
-                            "color": "#718096",
-                            "flex": 2
-                        },
+                        _TEMPERATURE_LABEL,
                         {
                             "type": "text",
                             "text": temperature,
@@ -1081,13 +1131,7 @@ class ReminderFlexCustomizer:
                     "layout": "horizontal",
                     "spacing": "xs",
                     "contents": [
-                        {
-                            "type": "text",
-                            "text": "💧 湿度:",
-                            "size": "xs",
-                            "color": "#718096",
-                            "flex": 2
-                        },
+                        _HUMIDITY_LABEL,
                         {
                             "type": "text",
                             "text": humidity,
@@ -1104,13 +1148,7 @@ class ReminderFlexCustomizer:
                     "layout": "horizontal",
                     "spacing": "xs",
                     "contents": [
-                        {
-                            "type": "text",
-                            "text": "☔ 降水確率:",
-                            "size": "xs",
-                            "color": "#718096",
-                            "flex": 2
-                        },
+                        _PRECIPITATION_LABEL,
                         {
                             "type": "text",
                             "text": precipitation,
@@ -1128,12 +1166,7 @@ class ReminderFlexCustomizer:
                     "spacing": "xs",
                     "margin": "sm",
                     "contents": [
-                        {
-                            "type": "text",
-                            "text": "💡",
-                            "size": "xs",
-                            "flex": 1
-                        },
+                        _ADVICE_ICON,
                         {
                             "type": "text",
                             "text": advice,
@@ -1145,14 +1178,7 @@ class ReminderFlexCustomizer:
                     ]
                 },
                 # 注意書き
-                {
-                    "type": "text",
-                    "text": "※ 天候により変更の可能性があります",
-                    "size": "xxs",
-                    "color": "#A0AEC0",
-                    "align": "center",
-                    "margin": "sm"
-                }
+                _WEATHER_DISCLAIMER
             ],
             "backgroundColor": "#F7FAFC",
             "paddingAll": "12px",
@@ -1176,21 +1202,27 @@ class ReminderFlexCustomizer:
                 temperature = ""
                 condition = ""
 
-                for section in body_contents:
-                    if section.get("type") == "box" and "contents" in section:
-                        for item in section["contents"]:
-                            if item.get("type") == "box" and "contents" in item:
-                                for sub_item in item["contents"]:
-                                    if sub_item.get("type") == "box" and "contents" in sub_item:
-                                        for text_item in sub_item["contents"]:
-                                            if text_item.get("type") == "text":
-                                                text = text_item.get("text", "")
-                                                # 気温情報
-                                                if "℃" in text and not temperature:
-                                                    temperature = text.strip()
-                                                # 天気情報
-                                                elif any(weather in text for weather in ["晴れ", "曇り", "雨", "雪", "霧"]) and not condition:
-                                                    condition = text.strip()
+                # body → box → box → box → text の階層にあるテキストのみを対象に、
+                # 明示的なスタックで元の並び順どおり走査（気温・天気が揃った時点で終了）
+                stack = [(section, 1) for section in list(body_contents)[::-1]]
+                while stack:
+                    element, depth = stack.pop()
+                    if depth < _SUMMARY_TEXT_DEPTH:
+                        if element.get("type") == "box" and "contents" in element:
+                            stack.extend((child, depth + 1) for child in list(element["contents"])[::-1])
+                        continue
+
+                    if element.get("type") == "text":
+                        text = element.get("text", "")
+                        # 気温情報
+                        if "℃" in text and not temperature:
+                            temperature = text.strip()
+                        # 天気情報
+                        elif _WEATHER_CONDITION_RE.search(text) and not condition:
+                            condition = text.strip()
+
+                        if temperature and condition:
+                            break
 
                 if condition and temperature:
                     return f"{condition} {temperature}"
@@ -1202,7 +1234,7 @@ class ReminderFlexCustomizer:
                     return "天候情報をご確認ください"
 
         except Exception as e:
-            print(f"天気サマリー抽出エラー: {e}")
+            logger.warning("天気サマリー抽出エラー: %s", e)
 
         return "天候情報をご確認ください"
 
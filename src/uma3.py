@@ -22,6 +22,8 @@ from typing import Optional
 # プロジェクトルートの絶対パス取得
 import os
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+# 履歴監視スクリプトの絶対パス（起動時に一度だけ計算）
+MONITORING_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "monitoring_historyfile.py")
 
 # === STEP 1: 選手情報管理システム ===
 class ExpandablePlayerInfoHandler:
@@ -441,6 +443,7 @@ import os
 import re
 import subprocess
 import sys
+import threading
 import traceback
 from datetime import datetime, timedelta
 
@@ -2005,6 +2008,18 @@ def get_next_note_for_reminder():
     return "直近の[ノート]は見つかりませんでした。"
 
 
+def start_monitoring_subprocess(script_path):
+    """履歴監視スクリプトを長時間稼働の子プロセスとして1回だけ起動する"""
+    # Windowsのローカル環境ではコンソールウィンドウを出さない（Railway/Linuxでは0）
+    creation_flags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
+    # 出力はPIPEにせず親プロセスへ引き継ぐ（未読のPIPEが溢れると子プロセスが停止するため）
+    return subprocess.Popen(
+        [sys.executable, script_path],
+        cwd=os.path.dirname(script_path),
+        creationflags=creation_flags
+    )
+
+
 if __name__ == "__main__":
     print("=" * 80)
     print("🚀 UMA3 LINE BOT - Railway対応版 起動中")
@@ -2055,38 +2070,35 @@ if __name__ == "__main__":
             after_debug = f"[UMA3 DEBUG] After load_chathistory_to_chromadb: CWD={os.getcwd()}"
             print(after_debug)
 
-        # monitoring_historyfile.py をサブプロセスでバックグラウンド起動
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        monitoring_script = os.path.join(current_dir, "monitoring_historyfile.py")
+        # 履歴ファイル監視をバックグラウンドで起動
+        # 既定は同一プロセス内のデーモンスレッド（インタプリタ起動・二重インポートなし）
+        # MONITOR_SUBPROCESS=1 の場合のみ従来どおりサブプロセスで分離起動（プロファイリング用）
+        environment_type = "Railway" if IS_RAILWAY else "Local"
 
-        if os.path.exists(monitoring_script):
+        if IS_RAILWAY:
+            print("🚀 Railway環境：ファイル監視機能を有効化中...")
+
+        if os.getenv("MONITOR_SUBPROCESS") != "1":
             try:
-                if IS_RAILWAY:
-                    print("🚀 Railway環境：ファイル監視機能を有効化中...")
-                    # Railway環境用の設定
-                    process = subprocess.Popen(
-                        [sys.executable, monitoring_script],
-                        cwd=current_dir,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE
-                    )
-                else:
-                    # ローカル環境用の設定
-                    creation_flags = subprocess.CREATE_NO_WINDOW if os.name == 'nt' else 0
-                    process = subprocess.Popen(
-                        [sys.executable, monitoring_script],
-                        cwd=current_dir,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        creationflags=creation_flags
-                    )
+                from monitoring_historyfile import ConversationMonitor
 
-                environment_type = "Railway" if IS_RAILWAY else "Local"
-                print(f"[INFO] Started monitoring script in {environment_type} environment: {monitoring_script} (PID: {process.pid})")
+                monitor_thread = threading.Thread(
+                    target=ConversationMonitor().start_monitoring,
+                    name="history-monitor",
+                    daemon=True
+                )
+                monitor_thread.start()
+                print(f"[INFO] Started monitoring thread in {environment_type} environment")
+            except Exception as e:
+                print(f"[ERROR] Failed to start monitoring thread: {e}")
+        elif os.path.exists(MONITORING_SCRIPT):
+            try:
+                process = start_monitoring_subprocess(MONITORING_SCRIPT)
+                print(f"[INFO] Started monitoring script in {environment_type} environment: {MONITORING_SCRIPT} (PID: {process.pid})")
             except Exception as e:
                 print(f"[ERROR] Failed to start monitoring script: {e}")
         else:
-            print(f"[WARNING] Monitoring script not found: {monitoring_script}")
+            print(f"[WARNING] Monitoring script not found: {MONITORING_SCRIPT}")
 
     except Exception as e:
         print(f"[ERROR] Error in history loading/monitoring setup: {e}")
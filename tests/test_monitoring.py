@@ -38,12 +38,7 @@ def test_monitoring_setup():
             print(f"  ディレクトリ内ファイル数: {len(files)}")
 
             # 関連ファイルの検索
-            relevant_files = []
-            for file in files:
-                for pattern in config.monitor_patterns:
-                    if pattern.replace("*", "") in file:
-                        relevant_files.append(file)
-                        break
+            relevant_files = [file for file in files if config.should_process_file(file)]
 
             print(f"  監視対象ファイル数: {len(relevant_files)}")
             for file in relevant_files[:5]:  # 最大5件表示
@@ -139,8 +134,7 @@ def test_real_monitoring():
     try:
         from monitoring_historyfile import ConversationMonitor, MonitoringConfig
 
-        config = MonitoringConfig()
-        config.polling_interval = 2  # 2秒間隔
+        config = MonitoringConfig(polling_interval=2)  # 2秒間隔
 
         monitor = ConversationMonitor(config)
 
@@ -170,7 +164,7 @@ def test_real_monitoring():
                             if file_path.is_file():
                                 file_str = str(file_path)
                                 if (file_str not in processed_files and
-                                    monitor._should_process_file(file_str)):
+                                    config.should_process_file(file_str)):
                                     print(f"[MONITOR] 検出: {file_str}")
                                     processed_files.add(file_str)
 
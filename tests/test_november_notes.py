@@ -155,9 +155,8 @@ def main():
     test_notes = create_test_notes_for_november()
 
     for note in test_notes:
-        note_detector.notes_db.append(note)
+        note_detector.add_note_to_db(note)
 
-    note_detector.save_notes_db()
     print(f"   追加完了: {len(test_notes)}件のテストノートを追加")
 
     # 3. 日付ベース検索を実行
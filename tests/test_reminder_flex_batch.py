@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+リマインダーFlex Messageの一括カスタマイズのテスト
+customize_batchが1件ずつのカスタマイズと同じ結果を返すことを確認
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+# プロジェクトルートを追加
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.reminder_flex_customizer import ReminderFlexCustomizer
+
+def test_customize_batch():
+    """一括カスタマイズと個別カスタマイズの結果比較テスト"""
+
+    print("=" * 70)
+    print("🧪 リマインダーFlex 一括カスタマイズ テスト")
+    print("=" * 70)
+
+    base_flex = {
+        "type": "flex",
+        "contents": {
+            "header": {"contents": [{"type": "text", "text": "📍 東京都大田区"}]},
+            "body": {
+                "contents": [
+                    {"type": "text", "text": "気温 25℃"},
+                    {"type": "text", "text": "湿度 60%"},
+                    {"type": "text", "text": "降水確率 20%"}
+                ]
+            }
+        }
+    }
+
+    content = """【練習試合のお知らせ】
+場所：萩中公園野球場
+集合時間：8:30
+連絡先：山田太郎"""
+
+    # 同じノートから複数のリマインダーを生成するケースを含める
+    notes = [
+        {"content": content, "date": datetime.now() + timedelta(days=days), "days_until": days,
+         "is_input_deadline": is_input_deadline}
+        for days, is_input_deadline in [(0, False), (1, False), (3, True), (0, True)]
+    ]
+
+    customizer = ReminderFlexCustomizer()
+    items = [(base_flex, note) for note in notes]
+
+    batch_results = customizer.customize_batch(items)
+    single_results = [customizer.customize_weather_flex_for_reminder(bf, note) for bf, note in items]
+
+    print(f"📊 件数: 一括 {len(batch_results)}件 / 個別 {len(single_results)}件")
+    assert len(batch_results) == len(notes)
+
+    for i, (batch_flex, single_flex) in enumerate(zip(batch_results, single_results), 1):
+        assert batch_flex == single_flex, f"テストケース {i} の結果が一致しません"
+        print(f"✅ テストケース {i}: {batch_flex['altText']}")
+
+    # 空の入力は空のリストを返す
+    assert customizer.customize_batch([]) == []
+    print("✅ 空の入力")
+
+    print("\n🎉 一括カスタマイズテスト完了")
+
+if __name__ == "__main__":
+    test_customize_batch()